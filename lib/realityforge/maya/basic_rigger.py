@@ -9,13 +9,15 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import contextlib
+import functools
 import math
 import re
-from typing import Optional
+from typing import Iterator, Optional
 
 import maya.api.OpenMaya as om
 import maya.cmds as cmds
-from parse import parse
+from parse import Parser
 
 from realityforge.maya import util as util
 
@@ -171,6 +173,17 @@ from realityforge.maya import util as util
 #  need to change rotation order with y first (i.e. yxz or yzx). Of course this should not be done on bones that are
 #  in world coordinates
 
+@functools.lru_cache(maxsize=None)
+def _get_parser(pattern: str) -> Parser:
+    """Return a compiled parser for the pattern.
+    The parsers are cached as compiling the pattern dominates the cost of parsing the short names used by the rig.
+
+    :param pattern: the f-string like pattern.
+    :return: the parser.
+    """
+    return Parser(pattern)
+
+
 class IkChain:
     def __init__(self, name: str,
                  joints: list[str],
@@ -178,6 +191,8 @@ class IkChain:
                  pole_vector_distance: float = 10):
         self.name = name
         self.joints = joints
+        # The joints as a set so that membership checks do not need to scan the list
+        self.joint_set = frozenset(joints)
         self.end_name = end_name if end_name else f"{name}_end"
         self.pole_vector_distance = pole_vector_distance
 
@@ -198,7 +213,7 @@ class IkChain:
         :param joint_base_name: the base name of the joint to check
         :return True if the chain contains the specified joint, false otherwise.
         """
-        return joint_base_name in self.joints
+        return joint_base_name in self.joint_set
 
     def does_chain_end_at_joint(self, joint_base_name: str) -> bool:
         """Return True if the chain ends at the specified joint.
@@ -248,6 +263,30 @@ class AuxControlConfig:
 
 
 class ControllerConfig:
+    # The configs are consulted for every control created so use slots for faster attribute access
+    __slots__ = ("name_matcher",
+                 "side_matcher",
+                 "priority",
+                 "aux_controls",
+                 "visibility_mode",
+                 "control_template",
+                 "control_set",
+                 "control_scale",
+                 "color",
+                 "translate_x",
+                 "translate_y",
+                 "translate_z",
+                 "rotate_x",
+                 "rotate_y",
+                 "rotate_z",
+                 "scale_x",
+                 "scale_y",
+                 "scale_z",
+                 "axis_overrides",
+                 "constrained_translate_axes",
+                 "constrained_rotate_axes",
+                 "constrained_scale_axes")
+
     def __init__(self,
                  name_matcher: Optional[str],
                  side_matcher: Optional[str] = None,
@@ -288,6 +327,26 @@ class ControllerConfig:
         self.scale_x = scale_x
         self.scale_y = scale_y
         self.scale_z = scale_z
+        # The transform channels that this config explicitly overrides. Precomputed so that consumers
+        # only visit the channels that have actually been specified.
+        self.axis_overrides = [(attr_name, value) for attr_name, value in [("translateX", translate_x),
+                                                                           ("translateY", translate_y),
+                                                                           ("translateZ", translate_z),
+                                                                           ("rotateX", rotate_x),
+                                                                           ("rotateY", rotate_y),
+                                                                           ("rotateZ", rotate_z),
+                                                                           ("scaleX", scale_x),
+                                                                           ("scaleY", scale_y),
+                                                                           ("scaleZ", scale_z)]
+                               if value is not None]
+        # The (x, y, z) axes that are constrained for each transform attribute or None if this config does
+        # not override every axis of the attribute. Precomputed as these are consulted for every control.
+        self.constrained_translate_axes = (translate_x, translate_y, translate_z) \
+            if self.any_translate_axis_control_overrides() else None
+        self.constrained_rotate_axes = (rotate_x, rotate_y, rotate_z) \
+            if self.any_rotate_axis_control_overrides() else None
+        self.constrained_scale_axes = (scale_x, scale_y, scale_z) \
+            if self.any_scale_axis_control_overrides() else None
 
     def any_translate_axis_control_overrides(self) -> bool:
         return self.translate_x is not None and self.translate_y is not None and self.translate_z is not None
@@ -353,6 +412,16 @@ class RiggingSettings:
                  # "Windows > Settings/Preferences > Preferences" so that highlighting will not
                  # flow down the hierarchy
                  selection_child_highlighting: bool = False,
+
+                 # Should the rigging process re-verify that the objects it uses are uniquely named before each use?
+                 # The skeleton is always verified before rigging starts and created objects are always checked, so
+                 # these additional checks are only useful when diagnosing problems with the rigging process.
+                 strict_validation: bool = False,
+
+                 # Should the rigging process be recorded in the undo queue so it can be undone as a single step?
+                 # Disabling this skips recording the many commands issued while building the rig. The existing
+                 # undo queue is not flushed but the rig creation itself can not be undone.
+                 record_undo: bool = True,
                  debug_logging: bool = True):
         self.root_group_name = root_group_name
         self.controls_group = controls_group
@@ -387,6 +456,8 @@ class RiggingSettings:
         self.cog_base_control_name = cog_base_control_name
         self.stop_joints = stop_joints if stop_joints else []
         self.selection_child_highlighting = selection_child_highlighting
+        self.strict_validation = strict_validation
+        self.record_undo = record_undo
         self.debug_logging = debug_logging
         self.cog_location_strategy = cog_location_strategy
         self.ik_chains = ik_chains if ik_chains else []
@@ -394,16 +465,74 @@ class RiggingSettings:
         self.right_side_name = right_side_name
         self.center_side_name = center_side_name
         self.none_side_name = none_side_name
+        # The fingerprint of the ik chains and the joints they reference when the chains were last validated.
+        # Used to skip validation when rigging is repeated (i.e. after a validate_only run) without changes.
+        self.validated_ik_chains_fingerprint = None
+        # A cache of (pattern, joint name) => base name. The base name of a joint is extracted multiple times
+        # while processing the joint, its parent and its children and parsing the name is comparatively expensive.
+        self.source_joint_base_name_cache: dict[tuple[str, str], str] = {}
+        # A cache of (controller name, side) => matching configs. Cleared at the start of each rig build.
+        self.matching_control_config_cache: dict[tuple[str, Optional[str]], list[ControllerConfig]] = {}
+        # A cache of (sided name pattern, side label) => the name patterns for the side
+        self.sided_name_patterns_cache: dict[tuple[str, str], tuple[str, str, str]] = {}
+        # The names of the control sets known to exist. Cleared at the start of each rig build.
+        self.existing_control_sets: set[str] = set()
 
     def find_matching_control_config(self, controller_name: str) -> list[ControllerConfig]:
-        attr_name = f"{controller_name}.rfJointSide"
-        side = cmds.getAttr(attr_name) if cmds.objExists(attr_name) else None
-        configs = []
+        return self.find_matching_control_config_for_side(controller_name,
+                                                          self.get_controller_side(controller_name))
+
+    def find_matching_control_config_for_side(self,
+                                              controller_name: str,
+                                              side: Optional[str]) -> list[ControllerConfig]:
+        """Return the configs that match the controller in priority order.
+        This can be used rather than find_matching_control_config when the caller already knows the side
+        of the controller, avoiding reading it back from the controller.
+
+        :param controller_name: the name of the controller.
+        :param side: the side of the controller or None if the side has not been set.
+        :return the matching configs.
+        """
+        # The side is part of the key as it is only added to the controller after it has been created
+        key = (controller_name, side)
+        configs = self.matching_control_config_cache.get(key)
+        if configs is None:
+            configs = list(self._iter_control_configs_matching_side(controller_name, side))
+            self.matching_control_config_cache[key] = configs
+        return configs
+
+    def get_sided_name_patterns(self, side_label: str) -> tuple[str, str, str]:
+        """Return the patterns that a name on the specified side is expected to match.
+        The patterns are the sided name pattern and the variants of the pattern without a sequence number.
+
+        :param side_label: the label of the side.
+        :return the patterns for the side.
+        """
+        key = (self.sided_name_pattern, side_label)
+        patterns = self.sided_name_patterns_cache.get(key)
+        if patterns is None:
+            p = self.sided_name_pattern.replace("{side}", side_label)
+            patterns = (p, p.replace("_{seq}", ""), p.replace("{seq}_", ""))
+            self.sided_name_patterns_cache[key] = patterns
+        return patterns
+
+    def get_controller_side(self, controller_name: str) -> Optional[str]:
+        """Return the side of the controller or None if the side has not been set.
+
+        :param controller_name: the name of the controller.
+        :return the side of the controller if any.
+        """
+        plug = _find_plug(f"{controller_name}.rfJointSide")
+        return plug.asString() if plug else None
+
+    def _iter_control_configs_matching_side(self,
+                                            controller_name: str,
+                                            side: Optional[str]) -> Iterator[ControllerConfig]:
+        # control_configurations is sorted by priority when the settings are constructed
         for cc in self.control_configurations:
             if not cc.name_matcher or re.search(cc.name_matcher, controller_name):
                 if not cc.side_matcher or (side and re.search(cc.side_matcher, side)):
-                    configs.append(cc)
-        return sorted(configs, key=lambda v: v.priority)
+                    yield cc
 
     # Return the name of the control the positions the character. This is either the world offset control or the
     def derive_character_offset_control_name(self) -> str:
@@ -463,14 +592,19 @@ class RiggingSettings:
         return self.driven_joint_name_pattern.format(name=base_name)
 
     def extract_source_joint_base_name(self, joint_name: str) -> str:
-        result = parse(self.driven_joint_name_pattern, joint_name)
-        if not result:
-            raise Exception(f"Joint named '{joint_name}' does not match expected pattern "
-                            f"'{self.driven_joint_name_pattern}'. Aborting!")
-        return result.named["name"]
+        key = (self.driven_joint_name_pattern, joint_name)
+        base_name = self.source_joint_base_name_cache.get(key)
+        if base_name is None:
+            result = _get_parser(self.driven_joint_name_pattern).parse(joint_name)
+            if not result:
+                raise Exception(f"Joint named '{joint_name}' does not match expected pattern "
+                                f"'{self.driven_joint_name_pattern}'. Aborting!")
+            base_name = result.named["name"]
+            self.source_joint_base_name_cache[key] = base_name
+        return base_name
 
     def extract_control_base_name(self, name: str) -> str:
-        result = parse(self.control_name_pattern, name)
+        result = _get_parser(self.control_name_pattern).parse(name)
         if not result:
             raise Exception(f"Control named '{name}' does not match expected pattern "
                             f"'{self.control_name_pattern}'. Aborting!")
@@ -516,15 +650,74 @@ class RiggingSettings:
         return None
 
 
+class SkeletonSnapshot:
+    """A snapshot of the joints in a skeleton collected in a single traversal of the scene.
+
+    The rigging process consults the hierarchy and the joint attributes many times, so they are collected
+    once up front rather than repeatedly queried from Maya while validating and processing each joint.
+    """
+
+    # The joint attributes captured in the snapshot
+    ATTRIBUTES = ["rotateAxis", "rotate", "scale", "preferredAngle"]
+
+    def __init__(self, root_joint_name: str):
+        self.root_joint_name = root_joint_name
+        # The names of the joints in depth-first order
+        self.joint_names: list[str] = []
+        # A map of joint name => name of the parent object or None if the joint is parented to the world
+        self.parents: dict[str, Optional[str]] = {}
+        # A map of joint name => names of the child joints
+        self.children: dict[str, list[str]] = {}
+        # A map of joint name => attribute name => (x, y, z) values
+        self.attribute_values: dict[str, dict[str, tuple[float, float, float]]] = {}
+
+    def contains_joint(self, joint_name: str) -> bool:
+        """Return True if the snapshot contains the specified joint.
+
+        :param joint_name: the name of the joint to check
+        :return True if the snapshot contains the specified joint, false otherwise.
+        """
+        return joint_name in self.attribute_values
+
+    def get_child_joints(self, joint_name: str) -> list[str]:
+        """Return the names of the joints that are direct children of the specified joint.
+
+        :param joint_name: the name of the joint
+        :return the names of the child joints.
+        """
+        return self.children.get(joint_name, [])
+
+    def get_attribute_value(self, joint_name: str, attr_name: str) -> tuple[float, float, float]:
+        """Return the value of the compound attribute on the specified joint.
+
+        :param joint_name: the name of the joint
+        :param attr_name: the name of the attribute. Must be one of ATTRIBUTES.
+        :return the (x, y, z) values of the attribute.
+        """
+        return self.attribute_values[joint_name][attr_name]
+
+
+# The translate, rotate and scale attributes of a transform object
+_TRANSFORM_AXIS_ATTRIBUTES = ("translateX", "translateY", "translateZ",
+                              "rotateX", "rotateY", "rotateZ",
+                              "scaleX", "scaleY", "scaleZ")
+
+# Sets of attributes that are locked and hidden on controls
+_SCALE_ATTRIBUTES = ("scaleX", "scaleY", "scaleZ")
+_SCALE_AND_VISIBILITY_ATTRIBUTES = _SCALE_ATTRIBUTES + ("visibility",)
+_ROTATE_AND_SCALE_ATTRIBUTES = ("rotateX", "rotateY", "rotateZ") + _SCALE_ATTRIBUTES
+
+# The suffixes of the translate, rotate and scale attributes of a transform object
+_TRANSFORM_AXIS_SUFFIXES = tuple(f".{attr_name}" for attr_name in _TRANSFORM_AXIS_ATTRIBUTES)
+
+
 def _hide_transform_properties(object_name: str) -> None:
     """Lock and remove from the channelbox the attributes of the specified transform object.
 
     :param object_name: the name of the transform object.
     """
-    for attr in ["translate", "rotate", "scale"]:
-        for axis in ["X", "Y", "Z"]:
-            cmds.setAttr(f"{object_name}.{attr}{axis}", lock=False)
-            cmds.setAttr(f"{object_name}.{attr}{axis}", keyable=False, channelBox=False)
+    for suffix in _TRANSFORM_AXIS_SUFFIXES:
+        cmds.setAttr(object_name + suffix, lock=False, keyable=False, channelBox=False)
     cmds.setAttr(f"{object_name}.visibility", keyable=False, channelBox=False)
 
 
@@ -533,11 +726,7 @@ def _lock_and_hide_transform_properties(object_name: str) -> None:
 
     :param object_name: the name of the transform object.
     """
-    for attr in ["translate", "rotate", "scale"]:
-        for axis in ["X", "Y", "Z"]:
-            cmds.setAttr(f"{object_name}.{attr}{axis}", lock=False)
-            cmds.setAttr(f"{object_name}.{attr}{axis}", lock=True, keyable=False, channelBox=False)
-    cmds.setAttr(f"{object_name}.visibility", lock=True, keyable=False, channelBox=False)
+    _hide_attributes(object_name, [(attr_name, True) for attr_name in _TRANSFORM_AXIS_ATTRIBUTES + ("visibility",)])
 
 
 def _unlock_transform_properties(object_name: str) -> None:
@@ -545,9 +734,8 @@ def _unlock_transform_properties(object_name: str) -> None:
 
     :param object_name: the name of the transform object.
     """
-    for attr in ["translate", "rotate", "scale"]:
-        for axis in ["X", "Y", "Z"]:
-            cmds.setAttr(f"{object_name}.{attr}{axis}", lock=False)
+    for suffix in _TRANSFORM_AXIS_SUFFIXES:
+        cmds.setAttr(object_name + suffix, lock=False)
     cmds.setAttr(f"{object_name}.visibility", lock=False)
 
 
@@ -571,7 +759,7 @@ def copy_control(source_control_name: str, target_control_name: str, rs: Rigging
                                            returnRootsOnly=True)[0]
     # Delete all children that are no nurbs curves as they are probably child offset groups
     # and will cause duplicate name errors in subsequent unlock call
-    children = cmds.listRelatives(duplicate_object_name)
+    children = cmds.listRelatives(duplicate_object_name, fullPath=True)
     if children:
         for child in children:
             if "nurbsCurve" != cmds.objectType(child):
@@ -608,7 +796,7 @@ def copy_control(source_control_name: str, target_control_name: str, rs: Rigging
                               scale=True,
                               normal=False)
 
-    target_children = cmds.listRelatives(target_control_name, type="nurbsCurve")
+    target_children = cmds.listRelatives(target_control_name, type="nurbsCurve", fullPath=True)
     if target_children:
         for child in target_children:
             cmds.delete(child)
@@ -627,7 +815,7 @@ def copy_control(source_control_name: str, target_control_name: str, rs: Rigging
     if rs.root_group_name:
         util.delete_history(rs.root_group_name)
 
-    _set_override_colors(target_control_name, rs)
+    _set_override_colors(target_control_name, rs.find_matching_control_config(target_control_name))
 
     # Clear selection to avoid unintended selection dependent behaviour
     cmds.select(clear=True)
@@ -640,78 +828,154 @@ def create_rig(root_joint_name: str,
         print(f"Creating rig with root joint '{root_joint_name}'")
 
     print(f"Validating skeleton with root joint '{root_joint_name}' is ready for rigging.")
+    rigging_settings.matching_control_config_cache.clear()
+    rigging_settings.existing_control_sets.clear()
+    skeleton = _collect_skeleton(root_joint_name)
     # Check the ik chains are valid
-    _validate_ik_chains(rigging_settings)
-    if 0 != _analyze_joints_in_hierarchy(root_joint_name, rigging_settings):
+    _validate_ik_chains(rigging_settings, skeleton)
+    if 0 != _analyze_joints(skeleton, rigging_settings):
         raise Exception(f"Invalid driven joints detected. Aborting!")
 
     if validate_only:
         print(f"Validation performed. Exiting early as requested.")
         return
 
-    _setup_top_level_infrastructure(rigging_settings)
-    _process_joint(rigging_settings, root_joint_name, True)
-    if rigging_settings.root_group_name:
-        util.delete_history(rigging_settings.root_group_name)
+    with _rig_build_context(rigging_settings):
+        _setup_top_level_infrastructure(rigging_settings)
+        _process_skeleton(rigging_settings, skeleton)
+        if rigging_settings.root_group_name:
+            util.delete_history(rigging_settings.root_group_name)
 
     if rigging_settings.debug_logging:
         print(f"Rig created for root joint '{root_joint_name}'")
 
 
-def _analyze_joint(object_name: str) -> bool:
+@contextlib.contextmanager
+def _rig_build_context(rs: RiggingSettings):
+    """Suspend viewport refresh and evaluation while the rig is built.
+    Otherwise every node, constraint and connection created during the build triggers a redraw and
+    re-evaluation of the partially constructed rig. The previous state is restored on exit.
+    The commands issued during the build are also grouped into a single undo chunk or, if the settings
+    disable undo recording, are not recorded in the undo queue at all.
+
+    :param rs: the settings used to create the rig.
+    """
+    # Each context only restores the state it changed so a failure part way through entering the
+    # contexts does not leave an undo chunk open or evaluation turned off.
+    # The build does not rename or delete the objects it validates so validation results can be reused
+    with util.undo_chunk("create_rig", not rs.record_undo), \
+            _preserve_selection(), \
+            util.suspend_evaluation(), \
+            util.use_select_tool(), \
+            util.suspend_refresh(), \
+            util.ensure_cache_scope():
+        yield
+
+
+@contextlib.contextmanager
+def _preserve_selection():
+    """Clear the selection within the context so that commands that act on the selection behave predictably.
+    Whatever was selected before the context that still exists is selected again on exit.
+    """
+    selection = cmds.ls(selection=True)
+    cmds.select(clear=True)
+    try:
+        yield
+    finally:
+        selection = [object_name for object_name in selection if cmds.objExists(object_name)]
+        if selection:
+            cmds.select(selection, noExpand=True)
+        else:
+            cmds.select(clear=True)
+
+
+def _collect_skeleton(root_joint_name: str) -> SkeletonSnapshot:
+    """Collect the joints in the hierarchy below the root joint in a single traversal of the scene.
+
+    :param root_joint_name: the name of the root joint.
+    :return: the snapshot of the skeleton.
+    """
+    util.ensure_single_object_named("joint", root_joint_name)
+
+    skeleton = SkeletonSnapshot(root_joint_name)
+
+    selection_list = om.MSelectionList()
+    selection_list.add(root_joint_name)
+    iterator = om.MItDag(om.MItDag.kDepthFirst, om.MFn.kJoint)
+    iterator.reset(selection_list.getDagPath(0), om.MItDag.kDepthFirst, om.MFn.kJoint)
+    while not iterator.isDone():
+        dag_path = iterator.getPath()
+        joint_name = dag_path.partialPathName()
+        if "|" in joint_name:
+            raise Exception(f"Multiple objects detected with the name {om.MFnDagNode(dag_path).name()}. Aborting!")
+
+        parent_path = om.MDagPath(dag_path).pop()
+        parent_name = parent_path.partialPathName() if parent_path.length() > 0 else None
+        skeleton.joint_names.append(joint_name)
+        skeleton.parents[joint_name] = parent_name
+        if joint_name != root_joint_name and parent_path.hasFn(om.MFn.kJoint):
+            skeleton.children.setdefault(parent_name, []).append(joint_name)
+        skeleton.attribute_values[joint_name] = \
+            {attr: tuple(cmds.getAttr(f"{joint_name}.{attr}")[0]) for attr in SkeletonSnapshot.ATTRIBUTES}
+
+        iterator.next()
+
+    return skeleton
+
+
+def _analyze_joint(joint_name: str, skeleton: SkeletonSnapshot) -> bool:
     """Check that the joint conforms to expected shape and conventions.
 
-    :param object_name: the name of the object to check.
-    :return: False if the object exists and is invalid, else True.
+    :param joint_name: the name of the joint to check.
+    :param skeleton: the snapshot of the skeleton containing the joint.
+    :return: False if the joint is invalid, else True.
     """
     for attr in ["rotateAxis", "rotate"]:
-        for axis in ["X", "Y", "Z"]:
-            attr_name = f'{object_name}.{attr}{axis}'
-            value = cmds.getAttr(attr_name)
+        for axis, value in zip(["X", "Y", "Z"], skeleton.get_attribute_value(joint_name, attr)):
+            attr_name = f'{joint_name}.{attr}{axis}'
             if not math.isclose(0., value, abs_tol=1e-6):
-                print(f"Invalid joint {object_name} as {attr_name} is not 0")
+                print(f"Invalid joint {joint_name} as {attr_name} is not 0")
                 return False
     for attr in ["scale"]:
-        for axis in ["X", "Y", "Z"]:
-            attr_name = f'{object_name}.{attr}{axis}'
-            value = cmds.getAttr(attr_name)
+        for axis, value in zip(["X", "Y", "Z"], skeleton.get_attribute_value(joint_name, attr)):
+            attr_name = f'{joint_name}.{attr}{axis}'
             if not math.isclose(1., value, abs_tol=1e-6):
-                print(f"Invalid joint {object_name} as {attr_name} is not 1. It is {value}")
+                print(f"Invalid joint {joint_name} as {attr_name} is not 1. It is {value}")
                 return False
     return True
 
 
-def _analyze_joints_in_hierarchy(object_name: str, rs: RiggingSettings) -> int:
-    """Check that the joints in object hierarchy conform to expected shape and conventions.
+def _analyze_joints(skeleton: SkeletonSnapshot, rs: RiggingSettings) -> int:
+    """Check that the driven joints in the skeleton conform to expected shape and conventions.
 
-    :param object_name: The root object name.
-    :param object_name_pattern: the f-string pattern used to match joint.
+    :param skeleton: the snapshot of the skeleton.
+    :param rs: the settings containing the pattern used to match driven joints.
     :return: The number of invalid joints.
     """
     bad_joints = 0
-    matched_object_names = cmds.ls(object_name, exactType="joint")
-    if 1 == len(matched_object_names):
-        if parse(rs.driven_joint_name_pattern, object_name):
-            if not _analyze_joint(object_name):
+    for joint_name in skeleton.joint_names:
+        if _get_parser(rs.driven_joint_name_pattern).parse(joint_name):
+            if not _analyze_joint(joint_name, skeleton):
                 bad_joints += 1
-    elif 0 != len(matched_object_names):
-        raise Exception(f"Multiple objects detected with the name {object_name}. Aborting!")
-
-    children = cmds.listRelatives(object_name)
-    if children:
-        for child in children:
-            bad_joints += _analyze_joints_in_hierarchy(child, rs)
 
     return bad_joints
 
 
-def _validate_ik_chains(rs: RiggingSettings) -> None:
+def _validate_ik_chains(rs: RiggingSettings, skeleton: SkeletonSnapshot) -> None:
     """Verify that the ik chains specified in the settings are valid.
-    They are valid if the joints in the ik chains are not overlapping, exist in the scene and have matching
+    They are valid if the joints in the ik chains are not overlapping, exist in the skeleton and have matching
     hierarchy.
 
     :param rs: the settings to check.
+    :param skeleton: the snapshot of the skeleton that the chains are applied to.
     """
+    fingerprint = _derive_ik_chains_fingerprint(rs, skeleton)
+    if fingerprint == rs.validated_ik_chains_fingerprint:
+        if rs.debug_logging:
+            print("Skipping ik chain validation as the chains have not changed since the last validation.")
+        return
+    rs.validated_ik_chains_fingerprint = None
+
     # A map of joint name => chain name. Used to ensure that a joint internal to a chain does not appear
     # in multiple chains
     internal_joints_in_ik_chains = {}
@@ -724,25 +988,26 @@ def _validate_ik_chains(rs: RiggingSettings) -> None:
             current_joint_base_name = chain.joints[index]
             current_joint_name = rs.derive_source_joint_name(current_joint_base_name)
             expected_previous_joint_name = rs.derive_source_joint_name(chain.joints[index - 1])
-            actual_previous_joint_name = util.get_parent(current_joint_name)
+            if not skeleton.contains_joint(current_joint_name):
+                raise Exception(f"Ik chain named '{chain.name}' references a joint named '{current_joint_name}'"
+                                f" that is not present in the skeleton with root joint "
+                                f"'{skeleton.root_joint_name}'. Aborting!")
+            actual_previous_joint_name = skeleton.parents[current_joint_name]
 
             if terminal_joint_index != index:
                 # If we are an internal joint in an ik chain then make sure we have preferredAngle specified
-                p = f'{current_joint_name}.preferredAngle'
-                if 0 == cmds.getAttr(f'{p}X') and 0 == cmds.getAttr(f'{p}Y') and 0 == cmds.getAttr(f'{p}Z'):
+                if all(0 == value for value in skeleton.get_attribute_value(current_joint_name, "preferredAngle")):
                     raise Exception(f"Ik chain named '{chain.name}' has an internal joint named '{current_joint_name}'"
                                     f" that has not specified a non-zero preferredAngle.")
             for attr in ["rotateAxis", "rotate"]:
-                for axis in ["X", "Y", "Z"]:
+                for axis, attr_value in zip(["X", "Y", "Z"], skeleton.get_attribute_value(current_joint_name, attr)):
                     attr_name = f'{current_joint_name}.{attr}{axis}'
-                    attr_value = cmds.getAttr(attr_name)
                     if 0 != attr_value:
                         raise Exception(f"Ik chain named '{chain.name}' has a joint named '{current_joint_name}'"
                                         f" that has a non-zero value for {attr_name}. Actual value: {attr_value}")
             for attr in ["scale"]:
-                for axis in ["X", "Y", "Z"]:
+                for axis, attr_value in zip(["X", "Y", "Z"], skeleton.get_attribute_value(current_joint_name, attr)):
                     attr_name = f'{current_joint_name}.{attr}{axis}'
-                    attr_value = cmds.getAttr(attr_name)
                     if not math.isclose(1., attr_value, rel_tol=1e-6):
                         raise Exception(f"Ik chain named '{chain.name}' has a joint named '{current_joint_name}'"
                                         f" that has a non-one value for {attr_name}. Actual value: {attr_value}")
@@ -762,33 +1027,58 @@ def _validate_ik_chains(rs: RiggingSettings) -> None:
 
             index -= 1
 
+    rs.validated_ik_chains_fingerprint = fingerprint
+
+
+def _derive_ik_chains_fingerprint(rs: RiggingSettings, skeleton: SkeletonSnapshot) -> int:
+    """Return a fingerprint of the ik chains and the state of the joints that they reference.
+    This captures everything that the validation of the ik chains depends upon.
+
+    :param rs: the settings containing the ik chains.
+    :param skeleton: the snapshot of the skeleton that the chains are applied to.
+    :return: the fingerprint.
+    """
+    state = []
+    for chain in rs.ik_chains:
+        joints = []
+        for joint_base_name in chain.joints:
+            joint_name = rs.derive_source_joint_name(joint_base_name)
+            if skeleton.contains_joint(joint_name):
+                attribute_values = tuple(skeleton.attribute_values[joint_name].items())
+                joints.append((joint_name, skeleton.parents[joint_name], attribute_values))
+            else:
+                joints.append((joint_name, None, None))
+        state.append((chain.name, tuple(joints)))
+    return hash((skeleton.root_joint_name, tuple(state)))
+
+
+def _get_world_translation(object_name: str) -> om.MVector:
+    """Return the world space translation of the specified dag object.
+    The translation is read directly from the world matrix rather than via a cmds.xform query.
+
+    :param object_name: the name of the dag object.
+    :return: the world space translation.
+    """
+    selection_list = om.MSelectionList()
+    selection_list.add(object_name)
+    matrix = selection_list.getDagPath(0).inclusiveMatrix()
+    return om.MVector(matrix[12], matrix[13], matrix[14])
+
 
-def _find_object_to_match_for_cog(root_joint_name: str, rs: RiggingSettings) -> Optional[str]:
+def _find_object_to_match_for_cog(root_joint_name: str,
+                                  skeleton: SkeletonSnapshot,
+                                  rs: RiggingSettings) -> Optional[str]:
     print(f"Finding cog position for root bone '{root_joint_name}' via strategy {rs.cog_location_strategy}")
     if "child_average" == rs.cog_location_strategy:
-        x = 0.0
-        y = 0.0
-        z = 0.0
-        object_count = 0.0
-        child_joints = cmds.listRelatives(root_joint_name, type="joint")
-        if child_joints:
-            for child_joint in child_joints:
-                # noinspection PyArgumentList
-                translation = cmds.xform(child_joint, query=True, worldSpace=True, translation=True)
-                # noinspection PyUnresolvedReferences
-                x += translation[0]
-                # noinspection PyUnresolvedReferences
-                y += translation[1]
-                # noinspection PyUnresolvedReferences
-                z += translation[2]
-                object_count += 1
-        if 0 == object_count:
+        child_joints = skeleton.get_child_joints(root_joint_name)
+        if 0 == len(child_joints):
             return None
         else:
-            final_x = x / object_count
-            final_y = y / object_count
-            final_z = z / object_count
-            translation = (final_x, final_y, final_z)
+            total = om.MVector()
+            for child_joint in child_joints:
+                total += _get_world_translation(child_joint)
+            centroid = total / float(len(child_joints))
+            translation = (centroid.x, centroid.y, centroid.z)
             locator_name = cmds.spaceLocator(absolute=True, position=translation)[0]
             cmds.xform(locator_name, worldSpace=True, translation=translation)
             return locator_name
@@ -798,7 +1088,80 @@ def _find_object_to_match_for_cog(root_joint_name: str, rs: RiggingSettings) ->
         return rs.cog_location_strategy
 
 
+def _setup_root_controls(rs: RiggingSettings,
+                         skeleton: SkeletonSnapshot,
+                         joint_name: str,
+                         base_name: str) -> tuple[str, str]:
+    """Create the world, world offset and cog controls that sit above the root joint of the skeleton.
+    These are only created once per rig so they are kept out of the per-joint processing in _process_joint.
+
+    :param rs: the settings.
+    :param skeleton: the snapshot of the skeleton.
+    :param joint_name: the name of the root joint.
+    :param base_name: the base name of the root joint.
+    :return: the name of the control that child controls are parented to and the name of the control that
+             constrains the root joint.
+    """
+    if rs.generate_world_offset_control:
+        root_control_name, _ = _setup_control(rs.world_base_control_name, None, None, rs)
+        _lock_and_hide_controller_attributes(root_control_name, _SCALE_AND_VISIBILITY_ATTRIBUTES)
+        control_name, _ = _setup_control(rs.world_offset_base_control_name, root_control_name, None, rs)
+        _lock_and_hide_controller_attributes(control_name, _SCALE_AND_VISIBILITY_ATTRIBUTES)
+    else:
+        control_name, _ = _setup_control(rs.world_base_control_name, None, None, rs)
+        _lock_and_hide_controller_attributes(control_name, _SCALE_AND_VISIBILITY_ATTRIBUTES)
+        root_control_name = control_name
+    joint_constraining_control_name = control_name
+    if rs.generate_skeleton_visibility_control:
+        cmds.addAttr(root_control_name,
+                     longName="rfShowSkeleton",
+                     niceName="Show Skeleton",
+                     attributeType="bool",
+                     defaultValue=0)
+        cmds.setAttr(f"{root_control_name}.rfShowSkeleton", channelBox=True, keyable=False)
+        cmds.setAttr(f"{joint_name}.visibility", channelBox=False, keyable=False)
+        cmds.connectAttr(f"{root_control_name}.rfShowSkeleton", f"{joint_name}.visibility", lock=True, force=True)
+
+    if rs.use_driver_hierarchy and rs.generate_driver_visibility_control:
+        cmds.addAttr(root_control_name,
+                     longName="rfShowDriverSkeleton",
+                     niceName="Show Driver Skeleton",
+                     attributeType="bool",
+                     defaultValue=0)
+        cmds.setAttr(f"{root_control_name}.rfShowDriverSkeleton", channelBox=True, keyable=False)
+        root_driver_joint_name = rs.derive_driver_joint_name(base_name)
+        cmds.setAttr(f"{root_driver_joint_name}.visibility", channelBox=False, keyable=False)
+        cmds.connectAttr(f"{root_control_name}.rfShowDriverSkeleton",
+                         f"{root_driver_joint_name}.visibility",
+                         lock=True,
+                         force=True)
+
+    if rs.generate_cog_control:
+        cog_locator = _find_object_to_match_for_cog(joint_name, skeleton, rs)
+        control_name, _ = _setup_control(rs.cog_base_control_name, control_name, cog_locator, rs)
+        _lock_and_hide_controller_attributes(control_name, _SCALE_AND_VISIBILITY_ATTRIBUTES)
+        if "child_average" == rs.cog_location_strategy:
+            cmds.delete(cog_locator)
+
+    return control_name, joint_constraining_control_name
+
+
+def _process_skeleton(rs: RiggingSettings, skeleton: SkeletonSnapshot) -> None:
+    """Create the rig elements for the joints in the skeleton in depth-first order.
+    An explicit stack is used rather than recursion so that deep hierarchies do not exhaust the python stack.
+
+    :param rs: the settings.
+    :param skeleton: the snapshot of the skeleton.
+    """
+    stack = [(skeleton.root_joint_name, True)]
+    while stack:
+        children = _process_joint(rs, skeleton, *stack.pop())
+        # Push the children in reverse order so that they are processed in the order they appear in the skeleton
+        stack.extend(reversed(children))
+
+
 def _process_joint(rs: RiggingSettings,
+                   skeleton: SkeletonSnapshot,
                    joint_name: str,
                    is_root: bool,
                    parent_joint_name: Optional[str] = None,
@@ -806,24 +1169,23 @@ def _process_joint(rs: RiggingSettings,
                    ik_chain: Optional[IkChain] = None,
                    force_point_constraint: bool = False,
                    force_orient_constraint: bool = False,
-                   force_scale_constraint: bool = False) -> None:
+                   force_scale_constraint: bool = False) -> list[tuple]:
+    """Create the rig elements for a single joint.
+
+    :return: the arguments with which to process each child joint.
+    """
     if rs.debug_logging:
         print(f"Attempting to process joint '{joint_name}' with parent joint named '{parent_joint_name}', "
               f"parent control named '{parent_control_name}' and ik chain {ik_chain}")
 
-    # Ensure there is a single joint of expected name
-    util.ensure_single_object_named("joint", joint_name)
-
-    # Ensure there is a single parent joint of expected name
-    if parent_joint_name:
-        util.ensure_single_object_named("joint", parent_joint_name)
+    # The joint and parent joint are known to be uniquely named joints as the skeleton snapshot verified this
 
     # Derive the base name
     base_name = rs.extract_source_joint_base_name(joint_name)
 
     if base_name in rs.stop_joints:
         print(f"Stopping rig creation at joint '{joint_name}' as it appears in stop_joints list.")
-        return
+        return []
 
     # Derive the base parent name
     base_parent_name = rs.extract_source_joint_base_name(parent_joint_name) if parent_joint_name else None
@@ -835,85 +1197,7 @@ def _process_joint(rs: RiggingSettings,
     control_name = None
     joint_constraining_control_name = None
     if is_root:
-        if rs.generate_world_offset_control:
-            root_control_name, _ = _setup_control(rs.world_base_control_name, None, None, rs)
-            _maybe_lock_and_hide_controller_transform_attributes(root_control_name,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 True,
-                                                                 True,
-                                                                 True,
-                                                                 True)
-            control_name, _ = _setup_control(rs.world_offset_base_control_name, root_control_name, None, rs)
-            _maybe_lock_and_hide_controller_transform_attributes(control_name,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 True,
-                                                                 True,
-                                                                 True,
-                                                                 True)
-        else:
-            control_name, _ = _setup_control(rs.world_base_control_name, None, None, rs)
-            _maybe_lock_and_hide_controller_transform_attributes(control_name,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 True,
-                                                                 True,
-                                                                 True,
-                                                                 True)
-            root_control_name = control_name
-        joint_constraining_control_name = control_name
-        if rs.generate_skeleton_visibility_control and is_root:
-            cmds.addAttr(root_control_name,
-                         longName="rfShowSkeleton",
-                         niceName="Show Skeleton",
-                         attributeType="bool",
-                         defaultValue=0)
-            cmds.setAttr(f"{root_control_name}.rfShowSkeleton", channelBox=True, keyable=False)
-            cmds.setAttr(f"{joint_name}.visibility", channelBox=False, keyable=False)
-            cmds.connectAttr(f"{root_control_name}.rfShowSkeleton", f"{joint_name}.visibility", lock=True, force=True)
-
-        if rs.use_driver_hierarchy and rs.generate_driver_visibility_control and is_root:
-            cmds.addAttr(root_control_name,
-                         longName="rfShowDriverSkeleton",
-                         niceName="Show Driver Skeleton",
-                         attributeType="bool",
-                         defaultValue=0)
-            cmds.setAttr(f"{root_control_name}.rfShowDriverSkeleton", channelBox=True, keyable=False)
-            cmds.setAttr(f"{rs.derive_driver_joint_name(base_name)}.visibility", channelBox=False, keyable=False)
-            cmds.connectAttr(f"{root_control_name}.rfShowDriverSkeleton",
-                             f"{rs.derive_driver_joint_name(base_name)}.visibility",
-                             lock=True,
-                             force=True)
-
-        if rs.generate_cog_control:
-            cog_locator = _find_object_to_match_for_cog(joint_name, rs)
-            control_name, _ = _setup_control(rs.cog_base_control_name, control_name, cog_locator, rs)
-            _maybe_lock_and_hide_controller_transform_attributes(control_name,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 True,
-                                                                 True,
-                                                                 True,
-                                                                 True)
-            if "child_average" == rs.cog_location_strategy:
-                cmds.delete(cog_locator)
+        control_name, joint_constraining_control_name = _setup_root_controls(rs, skeleton, joint_name, base_name)
     elif not ik_chain:
         control_name, _ = _setup_control(base_name, parent_control_name, joint_name, rs)
         joint_constraining_control_name = control_name
@@ -957,26 +1241,28 @@ def _process_joint(rs: RiggingSettings,
     in_chain_middle = False
 
     if ik_chain:
+        # Names used repeatedly while processing joints in the chain
+        chain_name = ik_chain.name
+        ik_end_name = rs.derive_ik_end_name(ik_chain)
+        ik_system_name = rs.derive_ik_system_name(ik_chain)
+
         chain_starts_at_current_joint = ik_chain.does_chain_start_at_joint(base_name)
         if chain_starts_at_current_joint:
             character_offset_control = rs.derive_character_offset_control_name()
 
             # Create a group for all the controls that are past the end off the ik chain and also
             # contains the IK/FK switch control
-            ik_end_name = rs.derive_ik_end_name(ik_chain)
-
             effector_end_ik_joint_name = rs.derive_driven_joint_name(ik_chain.joints[-1])
 
             _create_group("ik end group", ik_end_name, effector_end_ik_joint_name, rs)
 
             # Create a group to contain the Ik Handle and the controls for the PoleVector and IkHandle
-            ik_system_name = rs.derive_ik_system_name(ik_chain)
             _create_group("ik system group", ik_system_name, character_offset_control, rs)
             _parent_group("ik system group", ik_system_name, character_offset_control, rs)
             at_chain_start = True
 
             # Create Ik/FK switch
-            ik_switch_base_name = rs.derive_ik_switch_base_name(ik_chain.name)
+            ik_switch_base_name = rs.derive_ik_switch_base_name(chain_name)
             ik_switch_name, _ = _setup_control(ik_switch_base_name,
                                                ik_end_name,
                                                effector_end_ik_joint_name,
@@ -993,7 +1279,7 @@ def _process_joint(rs: RiggingSettings,
             cmds.setAttr(f"{ik_switch_name}.rfIkFkBlend", channelBox=True, keyable=True)
 
             # Create a reverse node so that it is inverse of ik switch
-            reverse_name = rs.derive_ik_switch_reverse_name(ik_chain.name)
+            reverse_name = rs.derive_ik_switch_reverse_name(chain_name)
             actual_reverse_name = cmds.shadingNode("reverse", asUtility=True, name=reverse_name)
             util.ensure_created_object_name_matches("ik fk reverse", actual_reverse_name, reverse_name)
 
@@ -1004,7 +1290,7 @@ def _process_joint(rs: RiggingSettings,
 
         # Create IK/FK controls and support joints
 
-        fk_joint_base_name = rs.derive_fk_joint_base_name(base_name, ik_chain.name)
+        fk_joint_base_name = rs.derive_fk_joint_base_name(base_name, chain_name)
         ik_parent_joint_name = None
         fk_parent_joint_name = None
         if base_parent_name:
@@ -1012,11 +1298,11 @@ def _process_joint(rs: RiggingSettings,
                 ik_parent_joint_name = rs.derive_target_joint_name(base_parent_name)
                 fk_parent_joint_name = rs.derive_target_joint_name(base_parent_name)
             else:
-                ik_parent_joint_name = rs.derive_ik_joint_name(base_parent_name, ik_chain.name)
-                fk_parent_joint_name = rs.derive_fk_joint_name(base_parent_name, ik_chain.name)
+                ik_parent_joint_name = rs.derive_ik_joint_name(base_parent_name, chain_name)
+                fk_parent_joint_name = rs.derive_fk_joint_name(base_parent_name, chain_name)
 
-        ik_joint_name = rs.derive_ik_joint_name(base_name, ik_chain.name)
-        fk_joint_name = rs.derive_fk_joint_name(base_name, ik_chain.name)
+        ik_joint_name = rs.derive_ik_joint_name(base_name, chain_name)
+        fk_joint_name = rs.derive_fk_joint_name(base_name, chain_name)
 
         _create_joint_from_template(joint_name, "ik joint", ik_joint_name, ik_parent_joint_name, rs)
         _create_joint_from_template(joint_name, "fk joint", fk_joint_name, fk_parent_joint_name, rs)
@@ -1035,13 +1321,10 @@ def _process_joint(rs: RiggingSettings,
         ik_fk_parent_constraint_name = _ik_fk_parent_constraint(target_joint_name, ik_joint_name, fk_joint_name, rs)
         ik_fk_scale_constraint_name = _ik_fk_scale_constraint(target_joint_name, ik_joint_name, fk_joint_name, rs)
 
-        cmds.setAttr(f"{ik_fk_parent_constraint_name}.w0", lock=False)
-        ik_enabled_attribute_name = rs.derive_ik_enabled_attribute_name(ik_chain.name)
-        fk_enabled_attribute_name = rs.derive_fk_enabled_attribute_name(ik_chain.name)
+        ik_enabled_attribute_name = rs.derive_ik_enabled_attribute_name(chain_name)
+        fk_enabled_attribute_name = rs.derive_fk_enabled_attribute_name(chain_name)
         cmds.connectAttr(ik_enabled_attribute_name, f"{ik_fk_parent_constraint_name}.w0", lock=True, force=True)
         cmds.connectAttr(fk_enabled_attribute_name, f"{ik_fk_parent_constraint_name}.w1", lock=True, force=True)
-
-        cmds.setAttr(f"{ik_fk_scale_constraint_name}.w0", lock=False)
         cmds.connectAttr(ik_enabled_attribute_name, f"{ik_fk_scale_constraint_name}.w0", lock=True, force=True)
         cmds.connectAttr(fk_enabled_attribute_name, f"{ik_fk_scale_constraint_name}.w1", lock=True, force=True)
 
@@ -1068,18 +1351,15 @@ def _process_joint(rs: RiggingSettings,
         _maybe_create_scale_constraint(control_configs, fk_joint_name, fk_joint_control_name, rs)
 
         if ik_chain.does_chain_end_at_joint(base_name):
-            # Make sure the end groups is correctly parented
-            ik_end_name = rs.derive_ik_end_name(ik_chain)
-            effector_end_ik_joint_name = rs.derive_driver_joint_name(
-                ik_chain.joints[-1]) if rs.use_driver_hierarchy else rs.derive_driven_joint_name(ik_chain.joints[-1])
-            _parent_group("ik end group", ik_end_name, effector_end_ik_joint_name, rs)
+            # Make sure the end groups is correctly parented. The current joint is the last joint in the chain
+            # so the target joint derived above is the effector end joint.
+            _parent_group("ik end group", ik_end_name, target_joint_name, rs)
 
-            ik_system_name = rs.derive_ik_system_name(ik_chain)
-            ik_handle_name = rs.derive_ik_handle_name(ik_chain.name)
-            pole_vector_base_name = rs.derive_pole_vector_base_name(ik_chain.name)
+            ik_handle_name = rs.derive_ik_handle_name(chain_name)
+            pole_vector_base_name = rs.derive_pole_vector_base_name(chain_name)
 
             # Create ik handle
-            ik_start_joint = rs.derive_ik_joint_name(ik_chain.joints[0], ik_chain.name)
+            ik_start_joint = rs.derive_ik_joint_name(ik_chain.joints[0], chain_name)
             actual_ik_handle_name, _ = cmds.ikHandle(name=ik_handle_name,
                                                      solver="ikRPsolver",
                                                      startJoint=ik_start_joint,
@@ -1090,17 +1370,7 @@ def _process_joint(rs: RiggingSettings,
             cmds.setAttr(f"{ik_handle_name}.visibility", 0, channelBox=False, lock=True)
             _safe_parent("ik handle", ik_handle_name, ik_system_name, rs)
             # Lock scale/rotate on handle as they do not do anything
-            _maybe_lock_and_hide_controller_transform_attributes(ik_handle_name,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 True,
-                                                                 True,
-                                                                 True,
-                                                                 True,
-                                                                 True,
-                                                                 True,
-                                                                 False)
+            _lock_and_hide_controller_attributes(ik_handle_name, _ROTATE_AND_SCALE_ATTRIBUTES)
 
             ik_parent_object_name = rs.derive_character_offset_control_name()
 
@@ -1120,17 +1390,7 @@ def _process_joint(rs: RiggingSettings,
             _scale_constraint(pole_vector_offset_group_name, ik_parent_object_name, rs, maintain_offset=True)
 
             # Translate is only modifiable constraint on pole vector control
-            _maybe_lock_and_hide_controller_transform_attributes(pole_vector_name,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 True,
-                                                                 True,
-                                                                 True,
-                                                                 True,
-                                                                 True,
-                                                                 True,
-                                                                 False)
+            _lock_and_hide_controller_attributes(pole_vector_name, _ROTATE_AND_SCALE_ATTRIBUTES)
 
             _unlock_transform_properties(pole_vector_offset_group_name)
 
@@ -1139,28 +1399,19 @@ def _process_joint(rs: RiggingSettings,
             # Use magical maths to find the plane on which pole control should lie
 
             # First find 3 points on plane
-            # noinspection PyArgumentList
-            ik_start_pos = cmds.xform(ik_start_joint, query=True, worldSpace=True, translation=True)
-            # noinspection PyArgumentList
-            ik_mid_pos = cmds.xform(ik_mid_joint_name, query=True, worldSpace=True, translation=True)
-            # noinspection PyArgumentList
-            ik_end_pos = cmds.xform(ik_joint_name, query=True, worldSpace=True, translation=True)
-
-            # Convert positions into vectors
-            # noinspection PyArgumentList
-            ik_start_vec = om.MVector(*ik_start_pos)
-            # noinspection PyArgumentList
-            ik_mid_vec = om.MVector(*ik_mid_pos)
-            # noinspection PyArgumentList
-            ik_end_vec = om.MVector(*ik_end_pos)
+            ik_start_vec = _get_world_translation(ik_start_joint)
+            ik_mid_vec = _get_world_translation(ik_mid_joint_name)
+            ik_end_vec = _get_world_translation(ik_joint_name)
 
             # Create vectors from start to each other point to define the plane
             ik_start_end_vec = ik_end_vec - ik_start_vec
             ik_start_mid_vec = ik_mid_vec - ik_start_vec
 
             # Calculate a unit vector from the pole back to handle
+            # The projection of the start->mid vector onto the start->end vector is v * (dot / |v|^2) which
+            # avoids the square roots required to normalize v and compute its length
             dot_product = ik_start_mid_vec * ik_start_end_vec
-            projection_vec = ik_start_end_vec.normal() * float(dot_product) / float(ik_start_end_vec.length())
+            projection_vec = ik_start_end_vec * (dot_product / (ik_start_end_vec * ik_start_end_vec))
 
             pole_vec = (ik_start_mid_vec - projection_vec) * ik_chain.pole_vector_distance
             pv_control_vec = pole_vec + ik_mid_vec
@@ -1184,17 +1435,7 @@ def _process_joint(rs: RiggingSettings,
             _scale_constraint(ik_handle_control_offset_group_name, ik_parent_object_name, rs, maintain_offset=True)
 
             # Lock and hide scale transform attributes on the ik handle control
-            _maybe_lock_and_hide_controller_transform_attributes(ik_handle_control_name,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 False,
-                                                                 True,
-                                                                 True,
-                                                                 True,
-                                                                 False)
+            _lock_and_hide_controller_attributes(ik_handle_control_name, _SCALE_ATTRIBUTES)
 
             # Ensure that the IK control constrains the ik end joint and end group
             _point_constraint(ik_handle_name, ik_handle_control_name, rs)
@@ -1204,32 +1445,31 @@ def _process_joint(rs: RiggingSettings,
         else:
             in_chain_middle = True
 
-    child_joints = cmds.listRelatives(joint_name, type="joint")
-    if child_joints:
-        for child_joint_name in child_joints:
-            child_base_joint_name = rs.extract_source_joint_base_name(child_joint_name)
-            child_parent_control_name = control_name
+    children = []
+    for child_joint_name in skeleton.get_child_joints(joint_name):
+        child_base_joint_name = rs.extract_source_joint_base_name(child_joint_name)
+        child_parent_control_name = control_name
+        child_ik_chain = None
+        if at_chain_end:
+            # If we are at the end of an ik chain then the child controls are placed in another group
+            child_parent_control_name = ik_end_name
             child_ik_chain = None
-            if at_chain_end:
-                # If we are at the end of an ik chain then the child controls are placed in another group
-                child_parent_control_name = rs.derive_ik_end_name(ik_chain)
-                child_ik_chain = None
-            elif in_chain_middle:
-                if ik_chain.does_chain_contain_joint(child_base_joint_name):
-                    child_ik_chain = ik_chain
-
-            if not child_ik_chain:
-                child_ik_chain = rs.get_ik_chain_starting_at_joint(child_base_joint_name)
-
-            _process_joint(rs,
-                           child_joint_name,
-                           False,
-                           joint_name,
-                           child_parent_control_name,
-                           child_ik_chain,
-                           force_point_constraint,
-                           force_orient_constraint,
-                           force_scale_constraint)
+        elif in_chain_middle:
+            if ik_chain.does_chain_contain_joint(child_base_joint_name):
+                child_ik_chain = ik_chain
+
+        if not child_ik_chain:
+            child_ik_chain = rs.get_ik_chain_starting_at_joint(child_base_joint_name)
+
+        children.append((child_joint_name,
+                         False,
+                         joint_name,
+                         child_parent_control_name,
+                         child_ik_chain,
+                         force_point_constraint,
+                         force_orient_constraint,
+                         force_scale_constraint))
+    return children
 
 
 def _maybe_create_point_constraint(control_configs: list[ControllerConfig],
@@ -1247,24 +1487,21 @@ def _maybe_create_point_constraint(control_configs: list[ControllerConfig],
     :param driver_object_name: the object that drives the driven object through constraint.
     :param rs: the associated RiggingSettings
     """
-    for control_config in control_configs:
-        if control_config.any_translate_axis_control_overrides():
-            include_x = control_config.translate_x is None or control_config.translate_x
-            include_y = control_config.translate_y is None or control_config.translate_y
-            include_z = control_config.translate_z is None or control_config.translate_z
-            if include_x or include_y or include_z:
-                _point_constraint(driven_object_name,
-                                  driver_object_name,
-                                  rs,
-                                  include_x=include_x,
-                                  include_y=include_y,
-                                  include_z=include_z,
-                                  maintain_offset=maintain_offset)
-                return True
-            return False
-
-    _point_constraint(driven_object_name, driver_object_name, rs, maintain_offset=maintain_offset)
-    return True
+    axes = next((c.constrained_translate_axes for c in control_configs if c.constrained_translate_axes), None)
+    if axes is None:
+        _point_constraint(driven_object_name, driver_object_name, rs, maintain_offset=maintain_offset)
+        return True
+    elif any(axes):
+        _point_constraint(driven_object_name,
+                          driver_object_name,
+                          rs,
+                          include_x=axes[0],
+                          include_y=axes[1],
+                          include_z=axes[2],
+                          maintain_offset=maintain_offset)
+        return True
+    else:
+        return False
 
 
 def _maybe_create_orient_constraint(control_configs: list[ControllerConfig],
@@ -1282,24 +1519,21 @@ def _maybe_create_orient_constraint(control_configs: list[ControllerConfig],
     :param driver_object_name: the object that drives the driven object through constraint.
     :param rs: the associated RiggingSettings
     """
-    for control_config in control_configs:
-        if control_config.any_rotate_axis_control_overrides():
-            include_x = control_config.rotate_x is None or control_config.rotate_x
-            include_y = control_config.rotate_y is None or control_config.rotate_y
-            include_z = control_config.rotate_z is None or control_config.rotate_z
-            if include_x or include_y or include_z:
-                _orient_constraint(driven_object_name,
-                                   driver_object_name,
-                                   rs,
-                                   include_x=include_x,
-                                   include_y=include_y,
-                                   include_z=include_z,
-                                   maintain_offset=maintain_offset)
-                return True
-            return False
-
-    _orient_constraint(driven_object_name, driver_object_name, rs, maintain_offset=maintain_offset)
-    return True
+    axes = next((c.constrained_rotate_axes for c in control_configs if c.constrained_rotate_axes), None)
+    if axes is None:
+        _orient_constraint(driven_object_name, driver_object_name, rs, maintain_offset=maintain_offset)
+        return True
+    elif any(axes):
+        _orient_constraint(driven_object_name,
+                           driver_object_name,
+                           rs,
+                           include_x=axes[0],
+                           include_y=axes[1],
+                           include_z=axes[2],
+                           maintain_offset=maintain_offset)
+        return True
+    else:
+        return False
 
 
 def _maybe_create_scale_constraint(control_configs: list[ControllerConfig],
@@ -1317,24 +1551,21 @@ def _maybe_create_scale_constraint(control_configs: list[ControllerConfig],
     :param driver_object_name: the object that drives the driven object through constraint.
     :param rs: the associated RiggingSettings
     """
-    for control_config in control_configs:
-        if control_config.any_scale_axis_control_overrides():
-            include_x = control_config.scale_x is None or control_config.scale_x
-            include_y = control_config.scale_y is None or control_config.scale_y
-            include_z = control_config.scale_z is None or control_config.scale_z
-            if include_x or include_y or include_z:
-                _scale_constraint(driven_object_name,
-                                  driver_object_name,
-                                  rs,
-                                  include_x=include_x,
-                                  include_y=include_y,
-                                  include_z=include_z,
-                                  maintain_offset=maintain_offset)
-                return True
-            return False
-
-    _scale_constraint(driven_object_name, driver_object_name, rs, maintain_offset=maintain_offset)
-    return True
+    axes = next((c.constrained_scale_axes for c in control_configs if c.constrained_scale_axes), None)
+    if axes is None:
+        _scale_constraint(driven_object_name, driver_object_name, rs, maintain_offset=maintain_offset)
+        return True
+    elif any(axes):
+        _scale_constraint(driven_object_name,
+                          driver_object_name,
+                          rs,
+                          include_x=axes[0],
+                          include_y=axes[1],
+                          include_z=axes[2],
+                          maintain_offset=maintain_offset)
+        return True
+    else:
+        return False
 
 
 def _connect_transform_attributes(driver_object_name: str, driven_object_name: str) -> None:
@@ -1367,9 +1598,9 @@ def _create_joint_from_template(source_joint_name: str,
                                 rs: RiggingSettings) -> None:
     if rs.debug_logging:
         print(f"Creating {label} '{new_joint_name}'")
-    actual_new_joint_name = cmds.joint(name=new_joint_name)
-    # Clear selection to avoid unintended selection dependent behaviour
+    # cmds.joint creates the joint beneath any selected joint so make sure nothing is selected
     cmds.select(clear=True)
+    actual_new_joint_name = cmds.joint(name=new_joint_name)
     util.ensure_created_object_name_matches(label, actual_new_joint_name, new_joint_name)
     if parent_new_joint_name:
         _safe_parent(label, new_joint_name, parent_new_joint_name, rs)
@@ -1377,14 +1608,10 @@ def _create_joint_from_template(source_joint_name: str,
         _safe_parent(label, new_joint_name, rs.driver_skeleton_group, rs)
     elif rs.root_group_name:
         _safe_parent(label, new_joint_name, rs.root_group_name, rs)
-    cmds.matchTransform(new_joint_name, source_joint_name)
-    cmds.makeIdentity(new_joint_name,
-                      apply=True,
-                      rotate=True,
-                      translate=True,
-                      preserveNormals=True,
-                      scale=True,
-                      normal=False)
+    # The new joint has zero rotation and unit scale and its orientation is copied from the source joint via the
+    # jointOrient attributes below, so it only remains to position the new joint at the source joint.
+    translation = _get_world_translation(source_joint_name)
+    cmds.xform(new_joint_name, worldSpace=True, translation=(translation.x, translation.y, translation.z))
     util.copy_attributes(source_joint_name,
                          new_joint_name,
                          [
@@ -1411,14 +1638,10 @@ def _create_joint_from_template(source_joint_name: str,
     _set_selection_child_highlighting(new_joint_name, rs)
     if rs.debug_logging:
         print(f"Created {label} named '{new_joint_name}'.")
-    # Clear selection to avoid unintended selection dependent behaviour
-    cmds.select(clear=True)
 
 
 def _set_selection_child_highlighting(object_name: str, rs: RiggingSettings):
-    selection_child_highlighting = 1 if rs.selection_child_highlighting else 0
-    # noinspection PyTypeChecker
-    cmds.setAttr(f"{object_name}.selectionChildHighlighting", selection_child_highlighting)
+    cmds.setAttr(f"{object_name}.selectionChildHighlighting", rs.selection_child_highlighting)
 
 
 def _setup_control(base_control_name: str,
@@ -1440,7 +1663,7 @@ def _setup_control(base_control_name: str,
         print(f"Creating {base_control_name} control for target '{target_object_name}' under "
               f"parent control '{parent_control_name}'")
 
-    if target_object_name:
+    if target_object_name and rs.strict_validation:
         util.ensure_single_object_named(None, target_object_name)
 
     offset_group_name = rs.derive_offset_group_name(base_control_name)
@@ -1453,11 +1676,7 @@ def _setup_control(base_control_name: str,
     control_name = rs.derive_control_name(base_control_name)
     control_configs = rs.find_matching_control_config(control_name)
 
-    aux_controls = None
-    for control_config in control_configs:
-        if control_config.aux_controls is not None:
-            aux_controls = control_config.aux_controls
-            break
+    aux_controls = next((c.aux_controls for c in control_configs if c.aux_controls is not None), None)
 
     control_parent = offset_group_name
 
@@ -1468,16 +1687,16 @@ def _setup_control(base_control_name: str,
             ac_group_name = acc.name_pattern.format(name=base_control_name)
             _create_group("aux control group", ac_group_name, control_parent, rs)
             _safe_parent("aux control group", ac_group_name, control_parent, rs)
-            cmds.setAttr(f"{ac_group_name}.translateX", lock=not acc.translate_x, keyable=False, channelBox=False)
-            cmds.setAttr(f"{ac_group_name}.translateY", lock=not acc.translate_y, keyable=False, channelBox=False)
-            cmds.setAttr(f"{ac_group_name}.translateZ", lock=not acc.translate_z, keyable=False, channelBox=False)
-            cmds.setAttr(f"{ac_group_name}.rotateX", lock=not acc.rotate_x, keyable=False, channelBox=False)
-            cmds.setAttr(f"{ac_group_name}.rotateY", lock=not acc.rotate_y, keyable=False, channelBox=False)
-            cmds.setAttr(f"{ac_group_name}.rotateZ", lock=not acc.rotate_z, keyable=False, channelBox=False)
-            cmds.setAttr(f"{ac_group_name}.scaleX", lock=not acc.scale_x, keyable=False, channelBox=False)
-            cmds.setAttr(f"{ac_group_name}.scaleY", lock=not acc.scale_y, keyable=False, channelBox=False)
-            cmds.setAttr(f"{ac_group_name}.scaleZ", lock=not acc.scale_z, keyable=False, channelBox=False)
-            cmds.setAttr(f"{ac_group_name}.visibility", lock=True, keyable=False, channelBox=False)
+            _hide_attributes(ac_group_name, [("translateX", not acc.translate_x),
+                                             ("translateY", not acc.translate_y),
+                                             ("translateZ", not acc.translate_z),
+                                             ("rotateX", not acc.rotate_x),
+                                             ("rotateY", not acc.rotate_y),
+                                             ("rotateZ", not acc.rotate_z),
+                                             ("scaleX", not acc.scale_x),
+                                             ("scaleY", not acc.scale_y),
+                                             ("scaleZ", not acc.scale_z),
+                                             ("visibility", True)])
             control_parent = ac_group_name
 
     _create_control(control_name, offset_group_name, rs)
@@ -1488,59 +1707,39 @@ def _setup_control(base_control_name: str,
     _configure_control_scale(control_name, parent_control_name, control_configs)
 
     _configure_control_set(control_name, control_configs, rs)
-    _configure_control_side(base_control_name, control_name, target_object_name, rs)
-    _set_override_colors(control_name, rs)
+    side = _configure_control_side(base_control_name, control_name, target_object_name, rs)
+    # Now that the side has been set, configs that match on side will also match the control
+    sided_control_configs = rs.find_matching_control_config_for_side(control_name, side)
+    _set_override_colors(control_name, sided_control_configs)
     if not omit_control_tag:
         _tag_controls(control_name, parent_control_name, control_configs, rs)
 
     # Hide attributes on the controller that we do not want animators to access and/or keyframe
     if use_config_to_manage_control_channels:
-        _lock_and_hide_controller_transform_attributes_based_on_config(control_name, rs, leave_visibility_unlocked)
+        _lock_and_hide_controller_transform_attributes_based_on_config(control_name,
+                                                                       sided_control_configs,
+                                                                       leave_visibility_unlocked)
 
     return control_name, offset_group_name
 
 
 def _configure_control_shape(control_name: str, control_configs: list[ControllerConfig], rs: RiggingSettings) -> None:
-    for control_config in control_configs:
-        if control_config.control_template:
-            copy_control(control_config.control_template, control_name, rs)
+    # Copying a template replaces the shapes of the control, so when several configs specify a template
+    # only the last template would survive. Copy just that template rather than every template in turn.
+    control_template = next((c.control_template for c in reversed(control_configs) if c.control_template), None)
+    if control_template:
+        copy_control(control_template, control_name, rs)
 
 
 def _configure_control_scale(control_name: str,
                              parent_control_name: str,
                              control_configs: list[ControllerConfig]) -> None:
-    scale = None
-    for config in control_configs:
-        if scale is None and config.control_scale:
-            scale = config.control_scale
-            break
+    scale = next((c.control_scale for c in control_configs if c.control_scale), None)
     if not scale and parent_control_name:
         # If we have a parent then try and make a random guess at what may be a good scale
 
-        # noinspection PyArgumentList
-
-        translation = cmds.xform(parent_control_name, query=True, worldSpace=True, translation=True)
-        # noinspection PyUnresolvedReferences
-        parent_x = translation[0]
-        # noinspection PyUnresolvedReferences
-        parent_y = translation[1]
-        # noinspection PyUnresolvedReferences
-        parent_z = translation[2]
-        # noinspection PyArgumentList
-        translation = cmds.xform(control_name, query=True, worldSpace=True, translation=True)
-        # noinspection PyUnresolvedReferences
-        control_x = translation[0]
-        # noinspection PyUnresolvedReferences
-        control_y = translation[1]
-        # noinspection PyUnresolvedReferences
-        control_z = translation[2]
-
-        x = parent_x - control_x
-        y = parent_y - control_y
-        z = parent_z - control_z
-
         # length of joint acts as a scale
-        scale = math.sqrt(x * x + y * y + z * z)
+        scale = (_get_world_translation(parent_control_name) - _get_world_translation(control_name)).length()
     if scale:
         if scale < 0.2:
             # Make sure the scale has a minimum value to avoid controls being scaled too small
@@ -1565,13 +1764,10 @@ def _tag_controls(control_name: str,
             cmds.controller(control_name, parent_control_name, parent=True)
         else:
             cmds.controller(control_name)
-        tag_name = None
-
-        results = cmds.listConnections(control_name, connections=True)
-        if results:
-            for r in results:
-                if r.startswith(f"{control_name}_tag"):
-                    tag_name = r
+        # The controller tag is connected to the message attribute of the control so only consider
+        # controller nodes connected to that attribute rather than every connection on the control
+        tags = cmds.listConnections(f"{control_name}.message", source=False, destination=True, type="controller")
+        tag_name = next((t for t in tags if t.startswith(f"{control_name}_tag")), None) if tags else None
         if not tag_name:
             raise Exception(f"Attempt to create tag for control {control_name} failed to produce a tag with "
                             f"the name {control_name}_tag. This is possibility due to failure to delete history "
@@ -1591,164 +1787,110 @@ def _tag_controls(control_name: str,
                 break
 
 
+# The sides indexed by the value of the side attribute on a joint. Any other value is treated as "none"
+_JOINT_SIDES = ("center", "left", "right")
+
+
 def _configure_control_side(base_control_name: str,
                             control_name: str,
                             target_object_name: str,
-                            rs: RiggingSettings) -> None:
+                            rs: RiggingSettings) -> str:
     side = "center"
-    if target_object_name and cmds.objExists(f"{target_object_name}.side"):
-        joint_side = cmds.getAttr(f"{target_object_name}.side")
-        if 0 == joint_side:
-            side = "center"
-            _expect_control_matches_side(side, rs.center_side_name, base_control_name, rs)
-            _expect_control_not_match_side(side, rs.left_side_name, base_control_name, rs)
-            _expect_control_not_match_side(side, rs.right_side_name, base_control_name, rs)
-            _expect_control_not_match_side(side, rs.none_side_name, base_control_name, rs)
-        elif 1 == joint_side:
-            side = "left"
-            _expect_control_not_match_side(side, rs.center_side_name, base_control_name, rs)
-            _expect_control_matches_side(side, rs.left_side_name, base_control_name, rs)
-            _expect_control_not_match_side(side, rs.right_side_name, base_control_name, rs)
-            _expect_control_not_match_side(side, rs.none_side_name, base_control_name, rs)
-        elif 2 == joint_side:
-            side = "right"
-            _expect_control_not_match_side(side, rs.center_side_name, base_control_name, rs)
-            _expect_control_not_match_side(side, rs.left_side_name, base_control_name, rs)
-            _expect_control_matches_side(side, rs.right_side_name, base_control_name, rs)
-            _expect_control_not_match_side(side, rs.none_side_name, base_control_name, rs)
-        else:
-            side = "none"
-            _expect_control_not_match_side(side, rs.center_side_name, base_control_name, rs)
-            _expect_control_not_match_side(side, rs.left_side_name, base_control_name, rs)
-            _expect_control_not_match_side(side, rs.right_side_name, base_control_name, rs)
-            _expect_control_matches_side(side, rs.none_side_name, base_control_name, rs)
+    side_plug = _find_plug(f"{target_object_name}.side") if target_object_name else None
+    if side_plug:
+        joint_side = side_plug.asInt()
+        side = _JOINT_SIDES[joint_side] if 0 <= joint_side < len(_JOINT_SIDES) else "none"
+        for candidate_side, side_label in [("center", rs.center_side_name),
+                                           ("left", rs.left_side_name),
+                                           ("right", rs.right_side_name),
+                                           ("none", rs.none_side_name)]:
+            if candidate_side == side:
+                _expect_control_matches_side(side, side_label, base_control_name, rs)
+            else:
+                _expect_control_not_match_side(side, side_label, base_control_name, rs)
     cmds.addAttr(control_name, longName="rfJointSide", niceName="Joint Side", dataType="string")
     cmds.setAttr(f"{control_name}.rfJointSide", side, type="string")
+    return side
 
 
 def _configure_control_set(control_name: str, control_configs: list[ControllerConfig], rs: RiggingSettings) -> None:
     if rs.use_control_set:
-        control_set = None
-        for control_config in control_configs:
-            if control_config.control_set:
-                control_set = control_config.control_set
-                break
+        control_set = next((c.control_set for c in control_configs if c.control_set), None)
 
         # Add control to the control set if configured
         if control_set:
-            _maybe_create_set(control_set, rs)
+            # Only check whether the set exists for the first control added to it
+            if control_set not in rs.existing_control_sets:
+                _maybe_create_set(control_set, rs)
+                rs.existing_control_sets.add(control_set)
             # noinspection PyArgumentList
             cmds.sets(control_name, edit=True, forceElement=control_set)
 
 
 def _lock_and_hide_controller_transform_attributes_based_on_config(control_name: str,
-                                                                   rs: RiggingSettings,
+                                                                   control_configs: list[ControllerConfig],
                                                                    leave_visibility_unlocked: bool = False) -> None:
-    control_configs = rs.find_matching_control_config(control_name)
-
-    translate_x = None
-    translate_y = None
-    translate_z = None
-    rotate_x = None
-    rotate_y = None
-    rotate_z = None
-    scale_x = None
-    scale_y = None
-    scale_z = None
+    # The first config (in priority order) that overrides a channel determines whether it is animatable
+    channels = {}
     for control_config in control_configs:
-        if translate_x is None and control_config.translate_x is not None:
-            translate_x = control_config.translate_x
-        if translate_y is None and control_config.translate_y is not None:
-            translate_y = control_config.translate_y
-        if translate_z is None and control_config.translate_z is not None:
-            translate_z = control_config.translate_z
-        if rotate_x is None and control_config.rotate_x is not None:
-            rotate_x = control_config.rotate_x
-        if rotate_y is None and control_config.rotate_y is not None:
-            rotate_y = control_config.rotate_y
-        if rotate_z is None and control_config.rotate_z is not None:
-            rotate_z = control_config.rotate_z
-        if scale_x is None and control_config.scale_x is not None:
-            scale_x = control_config.scale_x
-        if scale_y is None and control_config.scale_y is not None:
-            scale_y = control_config.scale_y
-        if scale_z is None and control_config.scale_z is not None:
-            scale_z = control_config.scale_z
-
-    _maybe_lock_and_hide_controller_transform_attributes(control_name,
-                                                         translate_x is not None and not translate_x,
-                                                         translate_y is not None and not translate_y,
-                                                         translate_z is not None and not translate_z,
-                                                         rotate_x is not None and not rotate_x,
-                                                         rotate_y is not None and not rotate_y,
-                                                         rotate_z is not None and not rotate_z,
-                                                         scale_x is not None and not scale_x,
-                                                         scale_y is not None and not scale_y,
-                                                         scale_z is not None and not scale_z,
-                                                         not leave_visibility_unlocked)
-
-
-def _maybe_lock_and_hide_controller_transform_attributes(control_name: str,
-                                                         lock_translate_x: bool,
-                                                         lock_translate_y: bool,
-                                                         lock_translate_z: bool,
-                                                         lock_rotate_x: bool,
-                                                         lock_rotate_y: bool,
-                                                         lock_rotate_z: bool,
-                                                         lock_scale_x: bool,
-                                                         lock_scale_y: bool,
-                                                         lock_scale_z: bool,
-                                                         lock_visibility: bool):
-    if lock_translate_x:
-        cmds.setAttr(f"{control_name}.translateX", lock=True, keyable=False, channelBox=False)
-    if lock_translate_y:
-        cmds.setAttr(f"{control_name}.translateY", lock=True, keyable=False, channelBox=False)
-    if lock_translate_z:
-        cmds.setAttr(f"{control_name}.translateZ", lock=True, keyable=False, channelBox=False)
-    if lock_rotate_x:
-        cmds.setAttr(f"{control_name}.rotateX", lock=True, keyable=False, channelBox=False)
-    if lock_rotate_y:
-        cmds.setAttr(f"{control_name}.rotateY", lock=True, keyable=False, channelBox=False)
-    if lock_rotate_z:
-        cmds.setAttr(f"{control_name}.rotateZ", lock=True, keyable=False, channelBox=False)
-    if lock_scale_x:
-        cmds.setAttr(f"{control_name}.scaleX", lock=True, keyable=False, channelBox=False)
-    if lock_scale_y:
-        cmds.setAttr(f"{control_name}.scaleY", lock=True, keyable=False, channelBox=False)
-    if lock_scale_z:
-        cmds.setAttr(f"{control_name}.scaleZ", lock=True, keyable=False, channelBox=False)
-    if lock_visibility:
-        cmds.setAttr(f"{control_name}.visibility", lock=True, keyable=False, channelBox=False)
+        for attr_name, value in control_config.axis_overrides:
+            channels.setdefault(attr_name, value)
+        if len(_TRANSFORM_AXIS_ATTRIBUTES) == len(channels):
+            # Every channel has been resolved so lower priority configs can not change the result
+            break
+
+    attr_names = tuple(attr_name for attr_name in _TRANSFORM_AXIS_ATTRIBUTES if not channels.get(attr_name, True))
+    if not leave_visibility_unlocked:
+        attr_names += ("visibility",)
+    _lock_and_hide_controller_attributes(control_name, attr_names)
+
+
+def _lock_and_hide_controller_attributes(control_name: str, attr_names: tuple[str, ...]) -> None:
+    """Lock the specified attributes on the control and remove them from the channelbox.
+
+    :param control_name: the name of the control.
+    :param attr_names: the names of the attributes to lock and hide.
+    """
+    if attr_names:
+        _hide_attributes(control_name, [(attr_name, True) for attr_name in attr_names])
+
+
+def _hide_attributes(object_name: str, attr_locks: list[tuple[str, bool]]) -> None:
+    """Remove the specified attributes from the channelbox and set whether they are locked.
+    Each attribute is updated with a single cmds.setAttr so that the change is recorded in the undo queue.
+
+    :param object_name: the name of the object.
+    :param attr_locks: a list of (attribute name, lock) tuples.
+    """
+    for attr_name, lock in attr_locks:
+        cmds.setAttr(f"{object_name}.{attr_name}", lock=lock, keyable=False, channelBox=False)
 
 
 def _expect_control_matches_side(side: str, side_label: str, base_control_name: str, rs: RiggingSettings) -> None:
     if side_label:
-        p = rs.sided_name_pattern.replace("{side}", side_label)
-        if not parse(p, base_control_name) and \
-                not parse(p.replace("_{seq}", ""), base_control_name) and \
-                not parse(p.replace("{seq}_", ""), base_control_name):
+        patterns = rs.get_sided_name_patterns(side_label)
+        if not any(_get_parser(p).parse(base_control_name) for p in patterns):
             raise Exception(f"Invalid name detected when creating control for side '{side}' with base "
-                            f"name '{base_control_name}' which was expected to match '{p}'")
+                            f"name '{base_control_name}' which was expected to match '{patterns[0]}'")
 
 
 def _expect_control_not_match_side(side: str, side_label: str, base_control_name: str, rs: RiggingSettings) -> None:
     if side_label:
-        p = rs.sided_name_pattern.replace("{side}", side_label)
-        if parse(p, base_control_name) or \
-                parse(p.replace("_{seq}", ""), base_control_name) or \
-                parse(p.replace("{seq}_", ""), base_control_name):
+        patterns = rs.get_sided_name_patterns(side_label)
+        if any(_get_parser(p).parse(base_control_name) for p in patterns):
             raise Exception(f"Invalid name detected when creating control for side '{side}' with base "
-                            f"name '{base_control_name}' which un-expectedly matched '{p}'")
+                            f"name '{base_control_name}' which un-expectedly matched '{patterns[0]}'")
 
 
-def _set_override_colors(control_name: str, rs: RiggingSettings) -> None:
-    child_shapes = cmds.listRelatives(control_name, type="nurbsCurve")
-    if child_shapes:
-        for child in child_shapes:
-            for c in rs.find_matching_control_config(control_name):
-                if c.color:
-                    _set_override_color_attributes(child, c.color)
-                    break
+def _set_override_colors(control_name: str, control_configs: list[ControllerConfig]) -> None:
+    color = next((c.color for c in control_configs if c.color), None)
+    # Only query the shapes when there is a color to apply. The shapes are queried rather than remembered
+    # from when the control was created, as copying a control template replaces the shapes of the control
+    if color:
+        child_shapes = cmds.listRelatives(control_name, type="nurbsCurve", fullPath=True)
+        if child_shapes:
+            for child in child_shapes:
+                _set_override_color_attributes(child, color)
 
 
 # noinspection PyTypeChecker
@@ -1756,9 +1898,7 @@ def _set_override_color_attributes(object_name: str, color: tuple[float, float,
     if color:
         cmds.setAttr(f"{object_name}.overrideEnabled", True)
         cmds.setAttr(f"{object_name}.overrideRGBColors", True)
-        cmds.setAttr(f"{object_name}.overrideColorR", color[0])
-        cmds.setAttr(f"{object_name}.overrideColorG", color[1])
-        cmds.setAttr(f"{object_name}.overrideColorB", color[2])
+        cmds.setAttr(f"{object_name}.overrideColorRGB", color[0], color[1], color[2])
 
 
 def _ik_fk_scale_constraint(driven_name: str,
@@ -1778,14 +1918,7 @@ def _ik_fk_scale_constraint(driven_name: str,
                                               name=object_name)[0]
     util.ensure_created_object_name_matches("scaleConstraint", actual_object_name, object_name)
 
-    # Lock and hide attributes on constraint
-    for attr_name in ["nodeState", "offsetX", "offsetY", "offsetZ"]:
-        cmds.setAttr(f"{object_name}.{attr_name}", channelBox=False, keyable=False, lock=True)
-
-    cmds.setAttr(f"{object_name}.visibility", 0, channelBox=False, keyable=False, lock=True)
-
-    # Clear selection to avoid unintended selection dependent behaviour
-    cmds.select(clear=True)
+    _lock_and_hide_constraint_attributes(object_name, ("nodeState", "offsetX", "offsetY", "offsetZ"))
 
     return object_name
 
@@ -1800,14 +1933,8 @@ def _pole_vector_constraint(driven_name: str, driver_name: str, rs: RiggingSetti
                                                    name=object_name)[0]
     util.ensure_created_object_name_matches("poleVectorConstraint", actual_object_name, object_name)
 
-    # Lock and hide attributes on constraint
-    for attr_name in ["nodeState", "offsetX", "offsetY", "offsetZ", "w0"]:
-        cmds.setAttr(f"{object_name}.{attr_name}", channelBox=False, keyable=False, lock=True)
-
-    cmds.setAttr(f"{object_name}.visibility", 0, channelBox=False, keyable=False, lock=True)
+    _lock_and_hide_constraint_attributes(object_name, ("nodeState", "offsetX", "offsetY", "offsetZ", "w0"))
 
-    # Clear selection to avoid unintended selection dependent behaviour
-    cmds.select(clear=True)
     return object_name
 
 
@@ -1822,22 +1949,30 @@ def _parent_constraint(driven_name: str, driver_name: str, rs: RiggingSettings,
                                                name=object_name)[0]
     util.ensure_created_object_name_matches("parentConstraint", actual_object_name, object_name)
 
-    # Lock and hide attributes on constraint
-    for attr_name in ["nodeState",
-                      "interpType",
-                      "rotationDecompositionTargetX",
-                      "rotationDecompositionTargetY",
-                      "rotationDecompositionTargetZ",
-                      "w0"]:
-        cmds.setAttr(f"{object_name}.{attr_name}", channelBox=False, keyable=False, lock=True)
-
-    cmds.setAttr(f"{object_name}.visibility", 0, channelBox=False, keyable=False, lock=True)
+    _lock_and_hide_constraint_attributes(object_name, ("nodeState",
+                                                       "interpType",
+                                                       "rotationDecompositionTargetX",
+                                                       "rotationDecompositionTargetY",
+                                                       "rotationDecompositionTargetZ",
+                                                       "w0"))
 
-    # Clear selection to avoid unintended selection dependent behaviour
-    cmds.select(clear=True)
     return object_name
 
 
+# The axes to skip when constraining, keyed by whether the (x, y, z) axes are included
+_CONSTRAINT_SKIP_AXES = {
+    (include_x, include_y, include_z):
+        tuple(axis for axis, included in zip("xyz", (include_x, include_y, include_z)) if not included) or ("none",)
+    for include_x in (True, False)
+    for include_y in (True, False)
+    for include_z in (True, False)
+}
+
+
+def _get_constraint_skip_axes(include_x: bool, include_y: bool, include_z: bool) -> list[str]:
+    return list(_CONSTRAINT_SKIP_AXES[(bool(include_x), bool(include_y), bool(include_z))])
+
+
 def _point_constraint(driven_name: str,
                       driver_name: str,
                       rs: RiggingSettings,
@@ -1845,15 +1980,7 @@ def _point_constraint(driven_name: str,
                       include_y: bool = True,
                       include_z: bool = True,
                       maintain_offset: bool = False) -> str:
-    skip = []
-    if not include_x:
-        skip.append("x")
-    if not include_y:
-        skip.append("y")
-    if not include_z:
-        skip.append("z")
-    if 0 == len(skip):
-        skip.append("none")
+    skip = _get_constraint_skip_axes(include_x, include_y, include_z)
     object_name = f"{driven_name}_pointConstraint_{driver_name}"
 
     if rs.debug_logging:
@@ -1868,14 +1995,8 @@ def _point_constraint(driven_name: str,
                                               name=object_name)[0]
     util.ensure_created_object_name_matches("orientConstraint", actual_object_name, object_name)
 
-    # Lock and hide attributes on constraint
-    for attr_name in ["nodeState", "offsetX", "offsetY", "offsetZ", "w0"]:
-        cmds.setAttr(f"{object_name}.{attr_name}", channelBox=False, keyable=False, lock=True)
+    _lock_and_hide_constraint_attributes(object_name, ("nodeState", "offsetX", "offsetY", "offsetZ", "w0"))
 
-    cmds.setAttr(f"{object_name}.visibility", 0, channelBox=False, keyable=False, lock=True)
-
-    # Clear selection to avoid unintended selection dependent behaviour
-    cmds.select(clear=True)
     return object_name
 
 
@@ -1886,15 +2007,7 @@ def _orient_constraint(driven_name: str,
                        include_y: bool = True,
                        include_z: bool = True,
                        maintain_offset: bool = False) -> str:
-    skip = []
-    if not include_x:
-        skip.append("x")
-    if not include_y:
-        skip.append("y")
-    if not include_z:
-        skip.append("z")
-    if 0 == len(skip):
-        skip.append("none")
+    skip = _get_constraint_skip_axes(include_x, include_y, include_z)
     object_name = f"{driven_name}_orientConstraint_{driver_name}"
 
     if rs.debug_logging:
@@ -1909,14 +2022,8 @@ def _orient_constraint(driven_name: str,
                                                name=object_name)[0]
     util.ensure_created_object_name_matches("orientConstraint", actual_object_name, object_name)
 
-    # Lock and hide attributes on constraint
-    for attr_name in ["nodeState", "interpType", "offsetX", "offsetY", "offsetZ", "w0"]:
-        cmds.setAttr(f"{object_name}.{attr_name}", channelBox=False, keyable=False, lock=True)
+    _lock_and_hide_constraint_attributes(object_name, ("nodeState", "interpType", "offsetX", "offsetY", "offsetZ", "w0"))
 
-    cmds.setAttr(f"{object_name}.visibility", 0, channelBox=False, keyable=False, lock=True)
-
-    # Clear selection to avoid unintended selection dependent behaviour
-    cmds.select(clear=True)
     return object_name
 
 
@@ -1931,15 +2038,7 @@ def _scale_constraint(driven_name: str,
         print(f"Adding scale constraint where '{driven_name}' is driven by '{driver_name}' including "
               f"axis x={include_x}, y={include_y}, z={include_z}")
 
-    skip = []
-    if not include_x:
-        skip.append("x")
-    if not include_y:
-        skip.append("y")
-    if not include_z:
-        skip.append("z")
-    if 0 == len(skip):
-        skip.append("none")
+    skip = _get_constraint_skip_axes(include_x, include_y, include_z)
     object_name = f"{driven_name}_scaleConstraint_{driver_name}"
     # noinspection PyTypeChecker
     actual_object_name = cmds.scaleConstraint(driver_name,
@@ -1949,14 +2048,8 @@ def _scale_constraint(driven_name: str,
                                               name=object_name)[0]
     util.ensure_created_object_name_matches("scaleConstraint", actual_object_name, object_name)
 
-    # Lock and hide attributes on constraint
-    for attr_name in ["nodeState", "offsetX", "offsetY", "offsetZ", "w0"]:
-        cmds.setAttr(f"{object_name}.{attr_name}", channelBox=False, keyable=False, lock=True)
+    _lock_and_hide_constraint_attributes(object_name, ("nodeState", "offsetX", "offsetY", "offsetZ", "w0"))
 
-    cmds.setAttr(f"{object_name}.visibility", 0, channelBox=False, keyable=False, lock=True)
-
-    # Clear selection to avoid unintended selection dependent behaviour
-    cmds.select(clear=True)
     return object_name
 
 
@@ -1977,21 +2070,42 @@ def _ik_fk_parent_constraint(driven_name: str,
                                                name=object_name)[0]
     util.ensure_created_object_name_matches("parentConstraint", actual_object_name, object_name)
 
-    # Lock and hide attributes on constraint
-    for attr_name in ["nodeState",
-                      "interpType",
-                      "rotationDecompositionTargetX",
-                      "rotationDecompositionTargetY",
-                      "rotationDecompositionTargetZ"]:
-        cmds.setAttr(f"{object_name}.{attr_name}", channelBox=False, keyable=False, lock=True)
+    _lock_and_hide_constraint_attributes(object_name, ("nodeState",
+                                                       "interpType",
+                                                       "rotationDecompositionTargetX",
+                                                       "rotationDecompositionTargetY",
+                                                       "rotationDecompositionTargetZ"))
 
-    cmds.setAttr(f"{object_name}.visibility", 0, channelBox=False, keyable=False, lock=True)
-
-    # Clear selection to avoid unintended selection dependent behaviour
-    cmds.select(clear=True)
     return object_name
 
 
+def _lock_and_hide_constraint_attributes(constraint_name: str, attr_names: tuple[str, ...]) -> None:
+    """Hide the constraint and lock the specified attributes and visibility, removing them from the channelbox.
+    Each attribute is updated with a single cmds.setAttr so that the change is recorded in the undo queue.
+
+    :param constraint_name: the name of the constraint.
+    :param attr_names: the names of the attributes to lock and hide.
+    """
+    cmds.setAttr(f"{constraint_name}.visibility", False)
+    for attr_name in attr_names + ("visibility",):
+        cmds.setAttr(f"{constraint_name}.{attr_name}", lock=True, keyable=False, channelBox=False)
+
+
+def _find_plug(attr_name: str) -> Optional[om.MPlug]:
+    """Return the plug for the attribute or None if the object or the attribute does not exist.
+    This avoids the separate cmds.objExists and cmds.getAttr calls when probing for an optional attribute.
+
+    :param attr_name: the name of the attribute including the object name.
+    :return: the plug if the attribute exists.
+    """
+    selection_list = om.MSelectionList()
+    try:
+        selection_list.add(attr_name)
+    except RuntimeError:
+        return None
+    return selection_list.getPlug(0)
+
+
 def _safe_parent(label: str, child_name: str, parent_name: str, rs: RiggingSettings):
     """Parent child to parent with additional checks to verify success and add debug logging."""
     if rs.debug_logging:
@@ -2000,9 +2114,6 @@ def _safe_parent(label: str, child_name: str, parent_name: str, rs: RiggingSetti
     if 0 == len(parented):
         raise Exception(f"Failed to parent '{child_name}' under '{parent_name}'")
 
-    # Clear selection to avoid unintended selection dependent behaviour
-    cmds.select(clear=True)
-
 
 def _parent_group(label: str, group_name: str, parent_object_name: Optional[str], rs: RiggingSettings) -> None:
     if parent_object_name and rs.use_control_hierarchy:
@@ -2037,9 +2148,8 @@ def _create_group(label: str, group_name: str, match_transform_object_name: Opti
         else:
             print(f"Creating {label} '{group_name}' at origin.")
 
-    if match_transform_object_name:
+    if match_transform_object_name and rs.strict_validation:
         util.ensure_single_object_named(None, match_transform_object_name)
-    cmds.select(clear=True)
     actual_object_name = cmds.group(name=group_name, empty=True)
     util.ensure_created_object_name_matches(label, actual_object_name, group_name)
     if match_transform_object_name:
@@ -2047,7 +2157,6 @@ def _create_group(label: str, group_name: str, match_transform_object_name: Opti
     _set_selection_child_highlighting(group_name, rs)
 
     _hide_transform_properties(group_name)
-    cmds.select(clear=True)
 
 
 def _create_control(control_name: str, offset_group_name: str, rs: RiggingSettings) -> None:
@@ -2061,7 +2170,8 @@ def _create_control(control_name: str, offset_group_name: str, rs: RiggingSettin
     """
     if rs.debug_logging:
         print(f"Creating control '{control_name}' in offset group '{offset_group_name}'")
-    util.ensure_single_object_named(None, offset_group_name)
+    if rs.strict_validation:
+        util.ensure_single_object_named(None, offset_group_name)
 
     # TODO: In the future we should support all sorts of control types (copy from catalog?) and
     #  scaling based on bone size and all sorts of options. For now we go with simple shape or copying from existing
@@ -2070,7 +2180,6 @@ def _create_control(control_name: str, offset_group_name: str, rs: RiggingSettin
     _set_selection_child_highlighting(control_name, rs)
 
     cmds.matchTransform(control_name, offset_group_name)
-    cmds.select(clear=True)
 
 
 def _setup_top_level_infrastructure(rs: RiggingSettings) -> None:
@@ -2099,15 +2208,7 @@ def _create_controls_group(rs: RiggingSettings) -> None:
     Create a group to contain all the controls.
     This is organisational and particularly useful if controls use constraints rather than a hierarchy.
     """
-    if rs.controls_group:
-        actual_controls_group_name = cmds.group(name=rs.controls_group, empty=True)
-        util.ensure_created_object_name_matches("controls group", actual_controls_group_name, rs.controls_group)
-        _set_selection_child_highlighting(rs.controls_group, rs)
-        _lock_and_hide_transform_properties(actual_controls_group_name)
-        # Clear selection to avoid unintended selection dependent behaviour
-        cmds.select(clear=True)
-        if rs.root_group_name:
-            _safe_parent("controls group", rs.controls_group, rs.root_group_name, rs)
+    _create_organisational_group("controls group", rs.controls_group, rs)
 
 
 def _create_driver_skeleton_group(rs: RiggingSettings) -> None:
@@ -2115,15 +2216,28 @@ def _create_driver_skeleton_group(rs: RiggingSettings) -> None:
     Create a group to contain the driver skeleton.
     This is used for organisational purposes.
     """
-    if rs.driver_skeleton_group and rs.driver_skeleton_group:
-        actual_group_name = cmds.group(name=rs.driver_skeleton_group, empty=True)
-        util.ensure_created_object_name_matches("driver skeleton group", actual_group_name, rs.driver_skeleton_group)
-        _set_selection_child_highlighting(rs.driver_skeleton_group, rs)
-        _lock_and_hide_transform_properties(rs.driver_skeleton_group)
-        # Clear selection to avoid unintended selection dependent behaviour
-        cmds.select(clear=True)
+    _create_organisational_group("driver skeleton group", rs.driver_skeleton_group, rs)
+
+
+def _create_organisational_group(label: str, group_name: Optional[str], rs: RiggingSettings) -> None:
+    """
+    Create an empty group under the root group (if any) with locked and hidden transform properties.
+
+    :param label: the label describing the group used in messages.
+    :param group_name: the name of the group or None if the group should not be created.
+    :param rs: the RiggingSettings.
+    """
+    if group_name:
         if rs.root_group_name:
-            _safe_parent("driver skeleton group", rs.driver_skeleton_group, rs.root_group_name, rs)
+            if rs.debug_logging:
+                print(f"Creating {label} '{group_name}' under '{rs.root_group_name}'")
+            # Create the group directly under the root group rather than parenting it in a separate step
+            actual_group_name = cmds.group(name=group_name, empty=True, parent=rs.root_group_name)
+        else:
+            actual_group_name = cmds.group(name=group_name, empty=True)
+        util.ensure_created_object_name_matches(label, actual_group_name, group_name)
+        _set_selection_child_highlighting(group_name, rs)
+        _lock_and_hide_transform_properties(group_name)
 
 
 def _maybe_create_set(set_name: str, rs: RiggingSettings) -> None:
@@ -2132,7 +2246,9 @@ def _maybe_create_set(set_name: str, rs: RiggingSettings) -> None:
     """
 
     if rs.use_control_set and 0 == len(cmds.ls(set_name, exactType="objectSet")):
-        _pre_top_level_create("set", "objectSet", set_name, rs)
+        # The set is known not to exist so there is no need for _pre_top_level_create to query it again
+        if rs.debug_logging:
+            print(f"Creating set '{set_name}'")
 
         cmds.sets(name=set_name, empty=True)
 
@@ -2155,8 +2271,5 @@ def _pre_top_level_create(label: str, maya_type: str, object_name: str, rs: Rigg
 
 
 def _post_top_level_create(label: str, object_name: str, rs: RiggingSettings):
-    # Clear selection to avoid unintended selection dependent behaviour
-    cmds.select(clear=True)
-
     if rs.debug_logging:
         print(f"Created {label} '{object_name}'")
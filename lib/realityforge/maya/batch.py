@@ -0,0 +1,93 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import multiprocessing
+import multiprocessing.util
+import os
+import pathlib
+import pickle
+import sys
+from typing import Any, Callable, Optional
+
+
+def _default_mayapy_path() -> str:
+    """Return the path to the mayapy interpreter of the Maya installation identified by MAYA_LOCATION.
+
+    :return: the path to mayapy.
+    """
+    maya_location = os.environ.get("MAYA_LOCATION")
+    if not maya_location:
+        raise Exception("Unable to locate mayapy as the MAYA_LOCATION environment variable is not set. Aborting!")
+    executable_name = "mayapy.exe" if sys.platform == "win32" else "mayapy"
+    return f"{pathlib.Path(maya_location) / 'bin' / executable_name}"
+
+
+def _initialize_worker() -> None:
+    # Maya is initialized once per worker process and reused for every scene the worker processes
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+    # Pool workers exit without running atexit handlers but do run multiprocessing finalizers
+    multiprocessing.util.Finalize(None, maya.standalone.uninitialize, exitpriority=10)
+
+
+def _process_scene(task: tuple[str, Callable[[str], Any], bool]) -> tuple[str, Any]:
+    import maya.cmds as cmds
+
+    path, fn, save = task
+    try:
+        cmds.file(path, open=True, force=True)
+        result = fn(path)
+        if save:
+            cmds.file(save=True, force=True)
+        return path, result
+    except Exception as e:
+        # Return the error rather than raising it so that a failing scene does not abort the other scenes.
+        # The error is sent back to the parent process so it is replaced if it can not be pickled.
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = Exception(f"{type(e).__name__}: {e}")
+        return path, e
+
+
+def run_over_scenes(paths: list[str],
+                    fn: Callable[[str], Any],
+                    processes: int = 4,
+                    save: bool = True,
+                    mayapy_path: Optional[str] = None) -> dict[str, Any]:
+    """Open each scene in a pool of mayapy worker processes, invoke the function and optionally save the scene.
+    Maya is single threaded so processing many scenes in a single session is serial. Each worker initializes
+    Maya standalone once and then processes scenes from the shared work queue until none remain.
+
+    The function is sent to the worker processes so it must be defined at the top level of an importable
+    module. It is invoked with the path of the scene once the scene has been opened.
+
+    :param paths: the paths of the scenes to process.
+    :param fn: the function invoked for each scene.
+    :param processes: the number of worker processes.
+    :param save: should the scene be saved after the function has been invoked.
+    :param mayapy_path: the path to mayapy. Derived from the MAYA_LOCATION environment variable if not specified.
+    :return: the value returned by the function for each scene, keyed by the path of the scene. If opening the
+             scene, invoking the function or saving the scene raised an exception, the exception is the value.
+    """
+    if not paths:
+        return {}
+
+    context = multiprocessing.get_context("spawn")
+    # Workers must run under mayapy rather than the current executable which may be the Maya GUI
+    context.set_executable(mayapy_path or _default_mayapy_path())
+    with context.Pool(processes=min(processes, len(paths)), initializer=_initialize_worker) as pool:
+        results = dict(pool.imap_unordered(_process_scene, [(path, fn, save) for path in paths]))
+        # Let the workers exit normally so that Maya is uninitialized before the pool is terminated
+        pool.close()
+        pool.join()
+    return results
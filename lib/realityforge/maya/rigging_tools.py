@@ -10,10 +10,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import contextlib
+
+import maya.api.OpenMaya as om
 import maya.cmds as cmds
-from parse import parse
+from parse import Parser
 import math
 
+from realityforge.maya import util as util
+
 
 # Note: to use this script you need to run
 # "C:\Program Files\Autodesk\Maya2023\bin\mayapy.exe" -m pip install --user parse
@@ -27,9 +33,12 @@ def connect_transform_attributes(driver_object_name: str, driven_object_name: st
     :param driver_object_name: the name of the driver object.
     :param driven_object_name:  the name of the driven object.
     """
-    for attr in ["translate", "rotate", "scale"]:
-        cmds.setAttr(f"{driven_object_name}.{attr}", lock=False)
-        cmds.connectAttr(f"{driver_object_name}.{attr}", f"{driven_object_name}.{attr}", lock=True, force=True)
+    util.connect_and_lock_attributes(_get_transform_connections(driver_object_name, driven_object_name))
+
+
+def _get_transform_connections(driver_object_name: str, driven_object_name: str) -> list[tuple[str, str]]:
+    return [(f"{driver_object_name}.{attr}", f"{driven_object_name}.{attr}")
+            for attr in ["translate", "rotate", "scale"]]
 
 
 def connect_transform_attributes_in_hierarchy(name: str,
@@ -41,48 +50,76 @@ def connect_transform_attributes_in_hierarchy(name: str,
     :param driven_object_name_pattern: the f-string pattern used to derive the driven name.
     :return: The number of objects matched.
     """
-    driver_name = driver_object_name_pattern.format(name=name)
-    driver = cmds.ls(driver_name)
-    if 0 == len(driver):
-        return 0
-    elif 1 != len(driver):
-        raise Exception(f"Multiple driver objects detected with the name {driver_name}. Aborting!")
-
-    driven_name = driven_object_name_pattern.format(name=name)
-    driven = cmds.ls(driven_name)
-    if 0 == len(driven):
-        return 0
-    elif 1 != len(driven):
-        raise Exception(f"Multiple driven objects detected with the name {driven_name}. Aborting!")
-
-    connect_transform_attributes(driver_name, driven_name)
-
-    transformed = 1
-
-    children = cmds.listRelatives(driven_name)
-    if children:
-        for child in children:
-            match = parse(driven_object_name_pattern, child)
-            if match:
-                child_base_name = match.named.get("name")
-                if child_base_name:
-                    transformed += connect_transform_attributes_in_hierarchy(child_base_name,
-                                                                             driver_object_name_pattern,
-                                                                             driven_object_name_pattern)
+    driven_object_name_parser = Parser(driven_object_name_pattern)
+    with _hierarchy_walk_context("connect_transform_attributes"):
+        # Count the objects with each short name in a single query rather than querying each name as it is visited
+        name_counts = collections.Counter(_get_short_name(object_name) for object_name in cmds.ls(long=True))
+        # Collect the connections for the whole hierarchy so that they can be made in a single batch
+        connections = []
+        transformed = 0
+        # The hierarchy is walked with an explicit stack of base names rather than recursively
+        pending_names = [name]
+        while pending_names:
+            base_name = pending_names.pop()
+
+            driver_name = driver_object_name_pattern.format(name=base_name)
+            driver_count = name_counts[driver_name]
+            if 0 == driver_count:
+                continue
+            elif 1 != driver_count:
+                raise Exception(f"Multiple driver objects detected with the name {driver_name}. Aborting!")
+
+            driven_name = driven_object_name_pattern.format(name=base_name)
+            driven_count = name_counts[driven_name]
+            if 0 == driven_count:
+                continue
+            elif 1 != driven_count:
+                raise Exception(f"Multiple driven objects detected with the name {driven_name}. Aborting!")
+
+            connections.extend(_get_transform_connections(driver_name, driven_name))
+            transformed += 1
 
-    return transformed
+            children = cmds.listRelatives(driven_name)
+            if children:
+                # Push in reverse so that children are visited in the same order as a recursive walk
+                for child in reversed(children):
+                    match = driven_object_name_parser.parse(child)
+                    if match:
+                        child_base_name = match.named.get("name")
+                        if child_base_name:
+                            pending_names.append(child_base_name)
+
+        util.connect_and_lock_attributes(connections)
+        return transformed
+
+
+# The translate, rotate and scale attributes of a transform object
+_TRS_ATTRIBUTES = ("translateX",
+                   "translateY",
+                   "translateZ",
+                   "rotateX",
+                   "rotateY",
+                   "rotateZ",
+                   "scaleX",
+                   "scaleY",
+                   "scaleZ")
+
+# The translate, rotate and scale attributes of a transform object paired with their identity value
+_TRS_ATTRIBUTE_IDENTITY_VALUES = tuple((attr_name, 1 if attr_name.startswith("scale") else 0)
+                                       for attr_name in _TRS_ATTRIBUTES)
+
+# The translate, rotate, scale and visibility attributes of a transform object
+_TRANSFORM_ATTRIBUTES = _TRS_ATTRIBUTES + ("visibility",)
 
 
 def lock_and_hide_transform_properties(object_name: str) -> None:
     """Lock and remove from the channelbox the attributes of the specified transform object.
+    Each attribute is updated with a single cmds.setAttr so that the change is recorded in the undo queue.
 
     :param object_name: the name of the transform object.
     """
-    for attr in ["translate", "rotate", "scale"]:
-        for axis in ["X", "Y", "Z"]:
-            cmds.setAttr(f"{object_name}.{attr}{axis}", lock=False)
-            cmds.setAttr(f"{object_name}.{attr}{axis}", lock=True, keyable=False, channelBox=False)
-    cmds.setAttr(f"{object_name}.visibility", lock=True, keyable=False, channelBox=False)
+    for attr_name in _TRANSFORM_ATTRIBUTES:
+        cmds.setAttr(f"{object_name}.{attr_name}", lock=True, keyable=False, channelBox=False)
 
 
 def lock_and_hide_transform_properties_in_hierarchy(object_name: str, object_name_pattern: str) -> int:
@@ -94,18 +131,12 @@ def lock_and_hide_transform_properties_in_hierarchy(object_name: str, object_nam
     :return: The number of objects matched.
     """
     transformed = 0
-    matched_object_names = cmds.ls(object_name, type=["transform"])
-    if 1 == len(matched_object_names):
-        if parse(object_name_pattern, object_name):
-            lock_and_hide_transform_properties(object_name)
-            transformed += 1
-    elif 0 != len(matched_object_names):
-        raise Exception(f"Multiple objects detected with the name {object_name}. Aborting!")
-
-    children = cmds.listRelatives(object_name, type=["transform"])
-    if children:
-        for child in children:
-            transformed += lock_and_hide_transform_properties_in_hierarchy(child, object_name_pattern)
+    parser = Parser(object_name_pattern)
+    with _hierarchy_walk_context("lock_and_hide_transform_properties"):
+        for matched_object_name in _list_hierarchy(object_name, type="transform"):
+            if parser.parse(_get_short_name(matched_object_name)):
+                lock_and_hide_transform_properties(matched_object_name)
+                transformed += 1
 
     return transformed
 
@@ -115,13 +146,18 @@ def zero_transform_properties(object_name: str) -> None:
 
     :param object_name: the name of the transform object.
     """
-    for attr in ["translate", "rotate"]:
-        for axis in ["X", "Y", "Z"]:
-            if not cmds.getAttr(f"{object_name}.{attr}{axis}", lock=True):
-                cmds.setAttr(f"{object_name}.{attr}{axis}", 0)
-    for axis in ["X", "Y", "Z"]:
-        if not cmds.getAttr(f"{object_name}.scale{axis}", lock=True):
-            cmds.setAttr(f"{object_name}.scale{axis}", 1)
+    # Inspect the lock state of the plugs directly rather than issuing a cmds.getAttr per attribute
+    selection_list = om.MSelectionList()
+    selection_list.add(object_name)
+    node = om.MFnDependencyNode(selection_list.getDependNode(0))
+    locked_attr_names = [attr_name for attr_name in _TRS_ATTRIBUTES if node.findPlug(attr_name, False).isLocked]
+    if not locked_attr_names:
+        # Reset all the attributes in a single command when none of them are locked
+        cmds.xform(object_name, translation=(0, 0, 0), rotation=(0, 0, 0), scale=(1, 1, 1))
+    else:
+        for attr_name, value in _TRS_ATTRIBUTE_IDENTITY_VALUES:
+            if attr_name not in locked_attr_names:
+                cmds.setAttr(f"{object_name}.{attr_name}", value)
 
 
 def zero_transform_properties_in_hierarchy(object_name: str, object_name_pattern: str) -> int:
@@ -133,18 +169,12 @@ def zero_transform_properties_in_hierarchy(object_name: str, object_name_pattern
     :return: The number of objects matched.
     """
     transformed = 0
-    matched_object_names = cmds.ls(object_name, type=["transform"])
-    if 1 == len(matched_object_names):
-        if parse(object_name_pattern, object_name):
-            zero_transform_properties(object_name)
-            transformed += 1
-    elif 0 != len(matched_object_names):
-        raise Exception(f"Multiple objects detected with the name {object_name}. Aborting!")
-
-    children = cmds.listRelatives(object_name, type=["transform"])
-    if children:
-        for child in children:
-            transformed += zero_transform_properties_in_hierarchy(child, object_name_pattern)
+    parser = Parser(object_name_pattern)
+    with _hierarchy_walk_context("zero_transform_properties"):
+        for matched_object_name in _list_hierarchy(object_name, type="transform"):
+            if parser.parse(_get_short_name(matched_object_name)):
+                zero_transform_properties(matched_object_name)
+                transformed += 1
 
     return transformed
 
@@ -166,18 +196,12 @@ def lock_influence_weights_in_hierarchy(object_name: str, object_name_pattern: s
     :return: The number of objects matched.
     """
     transformed = 0
-    matched_object_names = cmds.ls(object_name, exactType="joint")
-    if 1 == len(matched_object_names):
-        if parse(object_name_pattern, object_name):
-            lock_influence_weights(object_name)
-            transformed += 1
-    elif 0 != len(matched_object_names):
-        raise Exception(f"Multiple objects detected with the name {object_name}. Aborting!")
-
-    children = cmds.listRelatives(object_name)
-    if children:
-        for child in children:
-            transformed += lock_influence_weights_in_hierarchy(child, object_name_pattern)
+    parser = Parser(object_name_pattern)
+    with _hierarchy_walk_context("lock_influence_weights"):
+        for matched_object_name in _list_hierarchy(object_name, exactType="joint"):
+            if parser.parse(_get_short_name(matched_object_name)):
+                lock_influence_weights(matched_object_name)
+                transformed += 1
 
     return transformed
 
@@ -188,22 +212,18 @@ def analyze_control_transform(object_name: str) -> bool:
     :param object_name: the name of the object to check.
     :return: False if the object exists and is invalid, else True.
     """
-    for attr in ["translate", "rotate"]:
-        for axis in ["X", "Y", "Z"]:
-            attr_name = f'{object_name}.{attr}{axis}'
-            if 0 != cmds.getAttr(attr_name):
-                print(f"{object_name} BAD - {attr_name} is not 0")
-                return False
-            elif not cmds.getAttr(attr_name, lock=True) and not cmds.getAttr(attr_name, settable=True):
-                print(f"{object_name} BAD - {attr_name} is not settable and not locked. Assuming it is connected")
-                return False
-    for axis in ["X", "Y", "Z"]:
-        attr_name = f'{object_name}.scale{axis}'
-        if 1 != cmds.getAttr(attr_name):
-            print(f"{object_name} BAD - {attr_name} is not 1")
+    # The plugs are inspected directly rather than issuing several cmds.getAttr calls per attribute
+    selection_list = om.MSelectionList()
+    selection_list.add(object_name)
+    node = om.MFnDependencyNode(selection_list.getDependNode(0))
+    for attr_name, expected_value in _TRS_ATTRIBUTE_IDENTITY_VALUES:
+        plug = node.findPlug(attr_name, False)
+        if expected_value != plug.asDouble():
+            print(f"{object_name} BAD - {object_name}.{attr_name} is not {expected_value}")
             return False
-        elif not cmds.getAttr(attr_name, lock=True) and not cmds.getAttr(attr_name, settable=True):
-            print(f"{object_name} BAD - {attr_name} is not settable and not locked. Assuming it is connected")
+        elif not plug.isLocked and om.MPlug.kFreeToChange != plug.isFreeToChange():
+            print(f"{object_name} BAD - {object_name}.{attr_name} is not settable and not locked. "
+                  f"Assuming it is connected")
             return False
     # noinspection PyTypeChecker
     constraints = cmds.listRelatives(object_name,
@@ -227,18 +247,12 @@ def analyze_control_transforms_in_hierarchy(object_name: str, object_name_patter
     :return: The number of invalid controls.
     """
     bad_controls = 0
-    matched_object_names = cmds.ls(object_name, exactType="transform")
-    if 1 == len(matched_object_names):
-        if parse(object_name_pattern, object_name):
-            if not analyze_control_transform(object_name):
-                bad_controls += 1
-    elif 0 != len(matched_object_names):
-        raise Exception(f"Multiple objects detected with the name {object_name}. Aborting!")
-
-    children = cmds.listRelatives(object_name)
-    if children:
-        for child in children:
-            bad_controls += analyze_control_transforms_in_hierarchy(child, object_name_pattern)
+    parser = Parser(object_name_pattern)
+    with _hierarchy_walk_context("analyze_control_transforms"):
+        for matched_object_name in _list_hierarchy(object_name, exactType="transform"):
+            if parser.parse(_get_short_name(matched_object_name)):
+                if not analyze_control_transform(matched_object_name):
+                    bad_controls += 1
 
     return bad_controls
 
@@ -249,19 +263,16 @@ def analyze_joint(object_name: str) -> bool:
     :param object_name: the name of the object to check.
     :return: False if the object exists and is invalid, else True.
     """
+    # Read each compound attribute with a single getAttr rather than one per axis
     for attr in ["rotateAxis", "rotate"]:
-        for axis in ["X", "Y", "Z"]:
-            attr_name = f'{object_name}.{attr}{axis}'
-            value = cmds.getAttr(attr_name)
+        for axis, value in zip("XYZ", cmds.getAttr(f"{object_name}.{attr}")[0]):
             if not math.isclose(0., value, abs_tol=1e-6):
-                print(f"{object_name} BAD - {attr_name} is not 0")
+                print(f"{object_name} BAD - {object_name}.{attr}{axis} is not 0")
                 return False
     for attr in ["scale"]:
-        for axis in ["X", "Y", "Z"]:
-            attr_name = f'{object_name}.{attr}{axis}'
-            value = cmds.getAttr(attr_name)
+        for axis, value in zip("XYZ", cmds.getAttr(f"{object_name}.{attr}")[0]):
             if not math.isclose(1., value, abs_tol=1e-6):
-                print(f"{object_name} BAD - {attr_name} is not 1. It is {value}")
+                print(f"{object_name} BAD - {object_name}.{attr}{axis} is not 1. It is {value}")
                 return False
     return True
 
@@ -274,17 +285,45 @@ def analyze_joints_in_hierarchy(object_name: str, object_name_pattern: str) -> i
     :return: The number of invalid joints.
     """
     bad_joints = 0
-    matched_object_names = cmds.ls(object_name, exactType="joint")
-    if 1 == len(matched_object_names):
-        if parse(object_name_pattern, object_name):
-            if not analyze_joint(object_name):
-                bad_joints += 1
-    elif 0 != len(matched_object_names):
+    parser = Parser(object_name_pattern)
+    with _hierarchy_walk_context("analyze_joints"):
+        for matched_object_name in _list_hierarchy(object_name, exactType="joint"):
+            if parser.parse(_get_short_name(matched_object_name)):
+                if not analyze_joint(matched_object_name):
+                    bad_joints += 1
+
+    return bad_joints
+
+
+@contextlib.contextmanager
+def _hierarchy_walk_context(label: str):
+    """Suspend viewport refresh, evaluation and cycle checking while a hierarchy is processed.
+    Otherwise every attribute modified during the walk triggers a redraw and re-evaluation of the scene.
+    The select tool is also made current so the manipulators of the current tool are not updated.
+    The previous state is restored on exit and the changes are grouped into a single undo chunk.
+
+    :param label: the label used to name the undo chunk.
+    """
+    with util.undo_chunk(label, False), \
+            util.suspend_evaluation(), \
+            util.suspend_cycle_check(), \
+            util.use_select_tool(), \
+            util.suspend_refresh():
+        yield
+
+
+def _list_hierarchy(object_name: str, **kwargs) -> list[str]:
+    """Return the full paths of the object and all of its descendants that match the type filter.
+    The hierarchy is collected in a single query rather than by walking it one object at a time.
+
+    :param object_name: The root object name.
+    :param kwargs: the type filter passed to cmds.ls (i.e. type or exactType).
+    :return: the full paths of the matching objects.
+    """
+    if 1 < len(cmds.ls(object_name)):
         raise Exception(f"Multiple objects detected with the name {object_name}. Aborting!")
+    return cmds.ls(object_name, dag=True, long=True, **kwargs)
 
-    children = cmds.listRelatives(object_name)
-    if children:
-        for child in children:
-            bad_joints += analyze_joints_in_hierarchy(child, object_name_pattern)
 
-    return bad_joints
+def _get_short_name(object_path: str) -> str:
+    return object_path.rsplit("|", 1)[-1]
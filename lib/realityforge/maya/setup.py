@@ -10,6 +10,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
 import pathlib
 import sys
 
@@ -17,37 +18,66 @@ import maya.cmds as cmds
 import maya.mel as mel
 
 
+# The root directory of the workspace. Resolved once when the module is loaded.
+_BASE_DIR = pathlib.Path(__file__).resolve().parents[3]
+
+
+@functools.lru_cache(maxsize=None)
 def _workspace_path(relative_path: str) -> str:
-    base_dir = pathlib.Path(__file__).parent.parent.parent.parent.resolve()
-    path = pathlib.Path(f'{base_dir}/{relative_path}').resolve()
+    path = (_BASE_DIR / relative_path).resolve()
     return f"{path}"
 
 
 def _add_sys_path(relative_path: str) -> None:
-    sys.path.append(_workspace_path(relative_path))
+    path = _workspace_path(relative_path)
+    if path not in sys.path:
+        sys.path.append(path)
 
 
-def setup():
+# Set once the vendored libraries have been added to the path and started in this session
+_libraries_initialized = False
+
+
+def _initialize_libraries() -> None:
+    global _libraries_initialized
+    if _libraries_initialized:
+        return
+
     # Tween Machines used for setting up breakdown poses
 
-    # Add the path for TweenMachine library
+    # Add the path for TweenMachine library. The library is imported by the shelf button when first used.
     _add_sys_path('vendor/tweenMachine/python')
-    import tweenMachine
 
     # Red 9 plugin primarily used for pose mirroring
 
+    # Red9 is started once Maya is idle so that it does not delay startup
     _add_sys_path('vendor/Red9_StudioPack_Python3')
-    import Red9
-    Red9.start()
+    cmds.evalDeferred("import Red9\nRed9.start()", lowestPriority=True)
 
     # StudioLibrary plugin
     _add_sys_path('vendor/studiolibrary/src')
 
+    _libraries_initialized = True
+
+
+def setup():
+    # Starting the libraries is expensive so only do it the first time setup is run in a session
+    _initialize_libraries()
+
     # Assume for now that all commands go to Custom shelf
     parent = 'Custom'
-
-    names = cmds.shelfLayout(parent, query=True, childArray=True) or []
-    labels = [cmds.shelfButton(n, query=True, label=True) for n in names]
+    if not cmds.shelfLayout(parent, exists=True):
+        return
+
+    # Only query existing buttons until all the buttons we manage have been located
+    target_labels = {'TweenMachine', 'StudioLibrary', 'OpenExplorer'}
+    labels = set()
+    for name in cmds.shelfLayout(parent, query=True, childArray=True) or []:
+        label = cmds.shelfButton(name, query=True, label=True)
+        if label in target_labels:
+            labels.add(label)
+            if labels == target_labels:
+                break
 
     # Add Button for TweenMachine
     if 'TweenMachine' not in labels:
@@ -21,19 +21,12 @@ def smart_parent_constraint(driver_object_name, driven_object_names):
     :param driven_object_names:  The child or driven objects
     """
     for driven_object_name in driven_object_names:
-        skip_rotate = []
-        skip_translate = []
-        for axis in ['X', 'Y', 'Z']:
-            if util.is_locked(driven_object_name, f"rotate{axis}"):
-                skip_rotate.append(axis.lower())
-            if util.is_locked(driven_object_name, f"translate{axis}"):
-                skip_translate.append(axis.lower())
         # noinspection PyTypeChecker
         cmds.parentConstraint(driver_object_name,
                               driven_object_name,
                               maintainOffset=True,
-                              skipRotate=skip_rotate,
-                              skipTranslate=skip_translate)
+                              skipRotate=util.get_locked_axes(driven_object_name, "rotate"),
+                              skipTranslate=util.get_locked_axes(driven_object_name, "translate"))
 
 
 def smart_scale_constraint(driver_object_name, driven_object_names):
@@ -43,11 +36,7 @@ def smart_scale_constraint(driver_object_name, driven_object_names):
     :param driven_object_names:  The child or driven objects
     """
     for driven_object_name in driven_object_names:
-        skip = []
-        for axis in ['X', 'Y', 'Z']:
-            if util.is_locked(driven_object_name, f"scale{axis}"):
-                skip.append(axis.lower())
-        cmds.scaleConstraint(driver_object_name, driven_object_name, skip=skip)
+        cmds.scaleConstraint(driver_object_name, driven_object_name, skip=util.get_locked_axes(driven_object_name, "scale"))
 
 
 def smart_master_constraint(driver_object_name, driven_object_names):
@@ -10,13 +10,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import contextlib
 import os
 import pathlib
 import subprocess
 
+import maya.api.OpenMaya as om
 import maya.cmds as cmds
 from typing import Optional
 
+# The windows executables used to open a console or explorer. Resolved once when the module is loaded.
+_WINDIR = pathlib.Path(os.environ.get('WINDIR', r'C:\Windows'))
+_CMD_EXE = _WINDIR / 'system32' / 'cmd.exe'
+_EXPLORER_EXE = _WINDIR / 'explorer.exe'
+
 
 def open_console(path: str) -> None:
     """Open the windows command prompt in the specified directory.
@@ -25,9 +32,8 @@ def open_console(path: str) -> None:
     """
     actual_path = os.path.normpath(path)
 
-    explorer_path = pathlib.Path(os.getenv('WINDIR')) / r'system32\cmd.exe'
-
-    subprocess.run([explorer_path, "/K", "cd", actual_path])
+    # Do not wait for the process as it will not exit until the console is closed
+    subprocess.Popen([_CMD_EXE, "/K", "cd", actual_path], close_fds=True)
 
 
 def open_console_in_workspace() -> None:
@@ -43,12 +49,10 @@ def open_explorer(path: str) -> None:
     """
     actual_path = os.path.normpath(path)
 
-    explorer_path = pathlib.Path(os.getenv('WINDIR')) / 'explorer.exe'
-
     if os.path.isdir(actual_path):
-        subprocess.run([explorer_path, actual_path])
+        subprocess.Popen([_EXPLORER_EXE, actual_path], close_fds=True)
     elif os.path.isfile(actual_path):
-        subprocess.run([explorer_path, '/select,', actual_path])
+        subprocess.Popen([_EXPLORER_EXE, '/select,', actual_path], close_fds=True)
 
 
 def open_explorer_in_workspace() -> None:
@@ -77,12 +81,8 @@ def get_scene_short_name():
     # Get Full path of maya scene
     # noinspection PyArgumentList
     scene_filename = cmds.file(query=True, sceneName=True)
-    # Get last part of the path
-    local_scene_filename = scene_filename.split('/')[-1]
-    size = len(local_scene_filename)
-    # Remove ".mb" from the filename
-    scene_short_name = local_scene_filename[:size - 3]
-    return scene_short_name
+    # Get last part of the path with the extension (i.e. ".mb" or ".ma") removed
+    return pathlib.PurePosixPath(scene_filename).stem
 
 
 def select_if_present(object_name):
@@ -95,10 +95,13 @@ def select_if_present(object_name):
         bool: True if node was selected, False otherwise
     """
 
+    # Avoid raising and handling an exception in the common case where the object is absent
+    if not cmds.objExists(object_name):
+        return False
     try:
         cmds.select(object_name, replace=True)
         return True
-    except:
+    except (RuntimeError, ValueError):
         return False
 
 
@@ -119,100 +122,293 @@ def is_any_locked(object_name, attr_names):
     :param attr_names: a list of property names. They may be long or short names.
     :return: true if any specified property on the specified object is locked, false otherwise.
     """
-    for attr_name in attr_names:
-        if is_locked(object_name, attr_name):
-            return True
-    return False
+    # Resolve the object once and inspect the plugs rather than issuing a cmds.getAttr per property
+    node = _get_dependency_node(object_name)
+    return any(node.findPlug(attr_name, False).isLocked for attr_name in attr_names)
+
+
+# The suffix of each axis of a compound attribute paired with the name used by the constraint skip flags
+_AXES = (("X", "x"), ("Y", "y"), ("Z", "z"))
+
+
+def get_locked_axes(object_name: str, attr_name: str) -> list[str]:
+    """Return the axes of the specified compound property that are locked on the specified object.
+    The axes are returned in lower case so that they can be passed to the skip flags of the constraint commands.
+
+    :param object_name: the name of the object.
+    :param attr_name: the long name of the compound property. i.e. "translate", "rotate" or "scale".
+    :return: the locked axes. i.e. ["x", "z"]
+    """
+    node = _get_dependency_node(object_name)
+    return [axis for suffix, axis in _AXES if node.findPlug(f"{attr_name}{suffix}", False).isLocked]
 
 
-def lock_all_attributes(object_name: str, print_debug: bool = False, transitive: bool = True) -> None:
+def _get_dependency_node(object_name: str) -> om.MFnDependencyNode:
+    selection_list = om.MSelectionList()
+    selection_list.add(object_name)
+    return om.MFnDependencyNode(selection_list.getDependNode(0))
+
+
+def lock_all_attributes(object_name: str,
+                        print_debug: bool = False,
+                        transitive: bool = True,
+                        suspend_undo: bool = False) -> None:
     """Lock the attributes of the specified object and optionally lock all child objects.
 
     :param object_name: the name of the object to start lock process at.
     :param print_debug: should debug prints be emitted.
     :param transitive: should the locking process propagate to child.
+    :param suspend_undo: should the changes be left out of the undo queue rather than recorded as a single step.
     """
-    if print_debug:
-        print(f"lock_all_attributes({object_name}, transitive={transitive})")
-    if transitive:
-        children = cmds.listRelatives(object_name)
-        if children:
-            for child_object_name in cmds.listRelatives(object_name):
-                lock_all_attributes(child_object_name, print_debug, transitive)
-    for attr in cmds.listAttr(object_name):
-        qualified_attr_name = f"{object_name}.{attr}"
-        try:
-            if not cmds.getAttr(qualified_attr_name, lock=True):
-                if print_debug:
-                    print(f"{qualified_attr_name} is not Locked")
-                cmds.setAttr(qualified_attr_name, lock=True)
-                if print_debug:
-                    print(f"{qualified_attr_name} has been Locked")
-            else:
-                if print_debug:
-                    print(f"{qualified_attr_name} is Locked")
-        except ValueError:
+    with _bulk_edit("lock_all_attributes", suspend_undo):
+        for name in _collect_hierarchy(object_name, transitive):
             if print_debug:
-                print(f"Couldn't get locked-state of {qualified_attr_name}")
+                print(f"lock_all_attributes({name}, transitive={transitive})")
+            _lock_attributes(name, print_debug)
 
 
-def unlock_all_attributes(object_name: str, print_debug: bool = False, transitive: bool = True) -> None:
+def unlock_all_attributes(object_name: str,
+                          print_debug: bool = False,
+                          transitive: bool = True,
+                          suspend_undo: bool = False) -> None:
     """Unlock the attributes of the specified object and optionally unlock all child objects.
 
     :param object_name: the name of the object to start unlock process at.
     :param print_debug: should debug prints be emitted.
     :param transitive: should the unlocking process propagate to child.
+    :param suspend_undo: should the changes be left out of the undo queue rather than recorded as a single step.
     """
-    if print_debug:
-        print(f"unlock_all_attributes({object_name}, transitive={transitive})")
-    for attr in cmds.listAttr(object_name):
+    with _bulk_edit("unlock_all_attributes", suspend_undo):
+        for name in _collect_hierarchy(object_name, transitive):
+            if print_debug:
+                print(f"unlock_all_attributes({name}, transitive={transitive})")
+            if suspend_undo:
+                # Changes made through the API are not undoable so they can only be used when undo is suspended
+                _unlock_plugs(name, print_debug)
+            else:
+                _unlock_attributes(name, print_debug)
+
+
+def _lock_attributes(object_name: str, print_debug: bool) -> None:
+    """Lock the attributes of the specified object without visiting any child objects.
+
+    :param object_name: the name of the object.
+    :param print_debug: should debug prints be emitted.
+    """
+    # Only visit the attributes that are not already locked rather than querying the state of each attribute
+    for attr in cmds.listAttr(object_name, unlocked=True) or []:
         qualified_attr_name = f"{object_name}.{attr}"
         try:
-            if cmds.getAttr(qualified_attr_name, lock=True):
-                if print_debug:
-                    print(f"{qualified_attr_name} is Locked")
-                cmds.setAttr(qualified_attr_name, lock=False)
-                if print_debug:
-                    print(f"{qualified_attr_name} has been unlocked")
-            else:
-                if print_debug:
-                    print(f"{qualified_attr_name} is not Locked")
+            cmds.setAttr(qualified_attr_name, lock=True)
+            if print_debug:
+                print(f"{qualified_attr_name} has been Locked")
+        except ValueError:
+            if print_debug:
+                print(f"Couldn't set locked-state of {qualified_attr_name}")
+
+
+def _unlock_attributes(object_name: str, print_debug: bool) -> None:
+    """Unlock the attributes of the specified object without visiting any child objects.
+
+    :param object_name: the name of the object.
+    :param print_debug: should debug prints be emitted.
+    """
+    # Only visit the attributes that are locked rather than querying the state of each attribute
+    for attr in cmds.listAttr(object_name, locked=True) or []:
+        qualified_attr_name = f"{object_name}.{attr}"
+        try:
+            cmds.setAttr(qualified_attr_name, lock=False)
+            if print_debug:
+                print(f"{qualified_attr_name} has been unlocked")
         except ValueError:
             if print_debug:
-                print(f"Couldn't get locked-state of {qualified_attr_name}")
-    if transitive:
-        children = cmds.listRelatives(object_name)
-        if children:
-            for child_object_name in cmds.listRelatives(object_name):
-                unlock_all_attributes(child_object_name, print_debug, transitive)
+                print(f"Couldn't set locked-state of {qualified_attr_name}")
+
+
+def _unlock_plugs(object_name: str, print_debug: bool) -> None:
+    """Unlock the attributes of the specified object via the API without visiting any child objects.
+    This avoids issuing a command per attribute but the changes are not recorded in the undo queue.
+
+    :param object_name: the name of the object.
+    :param print_debug: should debug prints be emitted.
+    """
+    node = _get_dependency_node(object_name)
+    node_object = node.object()
+    for i in range(node.attributeCount()):
+        plug = om.MPlug(node_object, node.attribute(i))
+        if plug.isLocked:
+            try:
+                plug.isLocked = False
+                if print_debug:
+                    print(f"{plug.name()} has been unlocked")
+            except RuntimeError:
+                if print_debug:
+                    print(f"Couldn't set locked-state of {plug.name()}")
+
+
+# The number of suspend_refresh contexts that are currently active
+_refresh_suspend_depth = 0
+
+
+@contextlib.contextmanager
+def suspend_refresh():
+    """Suspend viewport refresh within the context.
+    Contexts may be nested and refresh is only resumed when the outermost context exits.
+    """
+    global _refresh_suspend_depth
+    if 0 == _refresh_suspend_depth:
+        cmds.refresh(suspend=True)
+    _refresh_suspend_depth += 1
+    try:
+        yield
+    finally:
+        _refresh_suspend_depth -= 1
+        if 0 == _refresh_suspend_depth:
+            cmds.refresh(suspend=False)
+
+
+@contextlib.contextmanager
+def suspend_evaluation():
+    """Turn off the evaluation manager within the context and restore the previous evaluation mode on exit."""
+    evaluation_mode = cmds.evaluationManager(query=True, mode=True)[0]
+    cmds.evaluationManager(mode="off")
+    try:
+        yield
+    finally:
+        cmds.evaluationManager(mode=evaluation_mode)
+
+
+@contextlib.contextmanager
+def suspend_cycle_check():
+    """Turn off cycle checking within the context and restore the previous state on exit."""
+    cycle_check = cmds.cycleCheck(query=True, evaluation=True)
+    cmds.cycleCheck(evaluation=False)
+    try:
+        yield
+    finally:
+        cmds.cycleCheck(evaluation=cycle_check)
+
+
+@contextlib.contextmanager
+def use_select_tool():
+    """Make the select tool current within the context and restore the previous tool on exit.
+    This avoids the manipulators of the current tool being updated as the selection changes.
+    """
+    current_context = cmds.currentCtx()
+    cmds.setToolTo("selectSuperContext")
+    try:
+        yield
+    finally:
+        cmds.setToolTo(current_context)
+
+
+@contextlib.contextmanager
+def _bulk_edit(chunk_name: str, suspend_undo: bool):
+    """Group the commands issued within the context into a single undo chunk (or leave them out of the
+    undo queue if suspend_undo is true) and suspend viewport refresh while they are issued.
+
+    :param chunk_name: the name of the undo chunk.
+    :param suspend_undo: should the commands be left out of the undo queue.
+    """
+    with undo_chunk(chunk_name, suspend_undo), suspend_refresh():
+        yield
+
+
+@contextlib.contextmanager
+def undo_chunk(chunk_name: str, suspend_undo: bool):
+    """Group the commands issued within the context into a single undo chunk or, if suspend_undo is
+    true, do not record them in the undo queue at all. The existing undo queue is not flushed.
+
+    :param chunk_name: the name of the undo chunk.
+    :param suspend_undo: should the commands be left out of the undo queue.
+    """
+    if suspend_undo:
+        undo_state = cmds.undoInfo(query=True, stateWithoutFlush=True)
+        cmds.undoInfo(stateWithoutFlush=False)
+    else:
+        cmds.undoInfo(openChunk=True, chunkName=chunk_name)
+    try:
+        yield
+    finally:
+        if suspend_undo:
+            cmds.undoInfo(stateWithoutFlush=undo_state)
+        else:
+            cmds.undoInfo(closeChunk=True)
+
+
+def _collect_hierarchy(object_name: str, transitive: bool) -> list[str]:
+    """Return the object and, if transitive, all of its descendants.
+    The hierarchy is walked breadth-first in a single MItDag traversal rather than querying the children
+    of each object. Descendants are returned as full paths so that they are unambiguous.
+
+    :param object_name: the name of the root object.
+    :param transitive: should the descendants of the object be included.
+    :return: the names of the objects.
+    """
+    if not transitive:
+        return [object_name]
+
+    selection_list = om.MSelectionList()
+    selection_list.add(object_name)
+    if not selection_list.getDependNode(0).hasFn(om.MFn.kDagNode):
+        # Dependency nodes have no descendants
+        return [object_name]
+
+    object_names = [object_name]
+    iterator = om.MItDag(om.MItDag.kBreadthFirst)
+    iterator.reset(selection_list.getDagPath(0), om.MItDag.kBreadthFirst)
+    # The first item is the root object which has already been added under the name supplied by the caller
+    iterator.next()
+    while not iterator.isDone():
+        object_names.append(iterator.fullPathName())
+        iterator.next()
+    return object_names
+
+
+def _collect_object_set_hierarchy(object_set_name: str) -> list[str]:
+    """Return the members of the object set and all of their descendants.
+    The descendants are collected with a single command and objects reachable from multiple members
+    are only returned once.
+
+    :param object_set_name: the object set.
+    :return: the full paths of the objects.
+    """
+    members = cmds.sets(object_set_name, query=True) or []
+    if not members:
+        return []
+    object_names = cmds.ls(members, long=True) or []
+    object_names += cmds.listRelatives(members, allDescendents=True, fullPath=True) or []
+    return list(dict.fromkeys(object_names))
 
 
-def lock_object_set(object_set_name: str) -> None:
+def lock_object_set(object_set_name: str, print_debug: bool = False) -> None:
     """Lock the attributes of all the objects in the specified object set.
 
     :param object_set_name: the object set
+    :param print_debug: should debug prints be emitted.
     """
-    print(f"lock_object_set {object_set_name}")
-    object_names_to_lock = cmds.sets(object_set_name, query=True)
-    print(f"Objects to lock: {object_names_to_lock}")
-    for object_name in object_names_to_lock:
-        print(f"Locking {object_name}")
-        lock_all_attributes(object_name)
-        print(f"Locked {object_name}")
+    object_names_to_lock = _collect_object_set_hierarchy(object_set_name)
+    if print_debug:
+        print(f"lock_object_set {object_set_name}")
+        print(f"Objects to lock: {object_names_to_lock}")
+    with _bulk_edit("lock_object_set", False):
+        for object_name in object_names_to_lock:
+            _lock_attributes(object_name, print_debug)
 
 
-def unlock_object_set(object_set_name: str) -> None:
+def unlock_object_set(object_set_name: str, print_debug: bool = False) -> None:
     """Unlock the attributes of all the objects in the specified object set.
 
     :param object_set_name: the object set
+    :param print_debug: should debug prints be emitted.
     """
-    print(f"unlock_object_set {object_set_name}")
-    object_names_to_lock = cmds.sets(object_set_name, query=True)
-    print(f"Objects to unlock: {object_names_to_lock}")
-    for object_name in object_names_to_lock:
-        print(f"Unlocking {object_name}")
-        unlock_all_attributes(object_name)
-        print(f"Unlocked {object_name}")
+    object_names_to_unlock = _collect_object_set_hierarchy(object_set_name)
+    if print_debug:
+        print(f"unlock_object_set {object_set_name}")
+        print(f"Objects to unlock: {object_names_to_unlock}")
+    with _bulk_edit("unlock_object_set", False):
+        for object_name in object_names_to_unlock:
+            _unlock_attributes(object_name, print_debug)
 
 
 def apply_material(object_name: str, material_name: str) -> None:
@@ -226,12 +422,38 @@ def apply_material(object_name: str, material_name: str) -> None:
     cmds.hyperShade(assign=material_name)
 
 
+# The (exact_type, object_name) pairs that have been validated within the current ensure_cache_scope.
+# None when no scope is active.
+_ensure_cache: Optional[set[tuple[Optional[str], str]]] = None
+
+
+@contextlib.contextmanager
+def ensure_cache_scope():
+    """Remember the names successfully validated by ensure_single_object_named within the context so
+    that repeated validation of the same name does not query the scene again. The scope should only
+    wrap operations that do not rename, delete or duplicate the validated objects. Nested scopes share
+    the outermost cache.
+    """
+    global _ensure_cache
+    if _ensure_cache is not None:
+        yield
+        return
+    _ensure_cache = set()
+    try:
+        yield
+    finally:
+        _ensure_cache = None
+
+
 def ensure_single_object_named(exact_type: Optional[str], object_name: str) -> None:
     """Generate an error if there is not exactly one object with the specified name.
 
     :param object_type: the type of the object (as used in error message)
     :param object_name: the name of the object.
     """
+    key = (exact_type, object_name)
+    if _ensure_cache is not None and key in _ensure_cache:
+        return
     if exact_type:
         actual_joint_names = cmds.ls(object_name, exactType=exact_type)
         object_type = exact_type
@@ -242,6 +464,8 @@ def ensure_single_object_named(exact_type: Optional[str], object_name: str) -> N
         raise Exception(f"Unable to locate {object_type} named '{object_name}'")
     elif 1 != len(actual_joint_names):
         raise Exception(f"Multiple {object_type} instances named '{object_name}'. Aborting!")
+    if _ensure_cache is not None:
+        _ensure_cache.add(key)
 
 
 def ensure_created_object_name_matches(object_description: str,
@@ -260,6 +484,27 @@ def ensure_created_object_name_matches(object_description: str,
                         f"the same name. Aborting!")
 
 
+def _set_attribute_value(attr: str, value) -> None:
+    """Set the attribute to a value as returned by getAttr.
+
+    The shape of the value returned by getAttr is used to select the form of setAttr rather than
+    issuing an additional query for the attribute type.
+
+    :param attr: the attribute in the form "object.attribute".
+    :param value: the value returned by getAttr.
+    """
+    if isinstance(value, str):
+        cmds.setAttr(attr, value, type="string")
+    elif isinstance(value, list) and value and isinstance(value[0], tuple):
+        # Numeric compounds such as double3 are returned as a list containing a single tuple
+        cmds.setAttr(attr, *value[0])
+    elif isinstance(value, list):
+        # Data attributes such as matrices are returned as a flat list
+        cmds.setAttr(attr, value, type=cmds.getAttr(attr, type=True))
+    else:
+        cmds.setAttr(attr, value)
+
+
 def copy_attributes(source_object_name: str, target_object_name: str, attribute_names: list[str]) -> None:
     """Copy the values of the specified attributes from the source object to the target object.
 
@@ -267,17 +512,35 @@ def copy_attributes(source_object_name: str, target_object_name: str, attribute_
     :param target_object_name: the target object.
     :param attribute_names: the attributes to copy
     """
-    for attribute_name in attribute_names:
-        try:
-            value = cmds.getAttr(f"{source_object_name}.{attribute_name}")
-        except Exception:
-            raise Exception(f"Failed to get attribute {source_object_name}.{attribute_name} when attempting "
-                            f"to copy attribute to {target_object_name}.{attribute_name}")
-        try:
-            cmds.setAttr(f"{target_object_name}.{attribute_name}", value)
-        except Exception:
-            raise Exception(f"Failed to set attribute {target_object_name}.{attribute_name} when attempting "
-                            f"to copy attribute from {source_object_name}.{attribute_name}")
+    if not attribute_names:
+        return
+
+    try:
+        # Copy all the values in a single native command
+        cmds.copyAttr(source_object_name,
+                      target_object_name,
+                      attribute=attribute_names,
+                      values=True,
+                      inConnections=False,
+                      outConnections=False,
+                      keepSourceConnections=False)
+        return
+    except RuntimeError:
+        # Fall through and copy attributes individually so that the failing attribute is reported
+        pass
+
+    with _bulk_edit("copy_attributes", False):
+        for attribute_name in attribute_names:
+            try:
+                value = cmds.getAttr(f"{source_object_name}.{attribute_name}")
+            except Exception:
+                raise Exception(f"Failed to get attribute {source_object_name}.{attribute_name} when attempting "
+                                f"to copy attribute to {target_object_name}.{attribute_name}")
+            try:
+                _set_attribute_value(f"{target_object_name}.{attribute_name}", value)
+            except Exception:
+                raise Exception(f"Failed to set attribute {target_object_name}.{attribute_name} when attempting "
+                                f"to copy attribute from {source_object_name}.{attribute_name}")
 
 
 def delete_history(object_name: str) -> int:
@@ -292,17 +555,28 @@ def delete_history(object_name: str) -> int:
     elif 1 != len(driver):
         raise Exception(f"Multiple objects detected with the name {object_name}. Aborting!")
 
-    shape_children = cmds.listRelatives(object_name, shapes=True)
-    if shape_children and 0 != len(shape_children):
-        cmds.select(object_name, replace=True)
-        cmds.bakePartialHistory(object_name, preDeformers=True)
-        count = 1
-    else:
-        count = 0
+    count = 0
+    # Names are only validated at the root, descendants are visited using their full path
+    stack = [driver[0]]
+    while stack:
+        node = stack.pop()
+        if cmds.listRelatives(node, shapes=True):
+            cmds.select(node, replace=True)
+            cmds.bakePartialHistory(node, preDeformers=True)
+            count += 1
 
-    children = cmds.listRelatives(object_name)
-    if children:
-        for child in children:
-            count += delete_history(child)
+        stack.extend(cmds.listRelatives(node, children=True, type="transform", fullPath=True) or [])
 
     return count
+
+
+def connect_and_lock_attributes(connections: list[tuple[str, str]]) -> None:
+    """Connect each source attribute to the destination attribute and lock the destination attribute,
+    replacing any existing connection to the destination attribute. The destination attribute is unlocked
+    before connecting so that attributes locked by an earlier invocation can be reconnected.
+
+    :param connections: a list of (source attribute name, destination attribute name) tuples.
+    """
+    for source_attr_name, destination_attr_name in connections:
+        cmds.setAttr(destination_attr_name, lock=False)
+        cmds.connectAttr(source_attr_name, destination_attr_name, lock=True, force=True)